@@ -25,5 +25,6 @@ CATS = {
         "fp":  "models/pattern/fp_growth.py",
         "hm":  "models/pattern/hmine.py",
         "ec":  "models/pattern/eclat.py",
+        "ps":  "models/pattern/prefixspan.py",
     },
 }
@@ -1,29 +1,315 @@
-import json,sys
-
-def assign(xs,cs):
-    cls=[[] for _ in cs]
-    for x in xs:
-        j=min(range(len(cs)),key=lambda k:abs(x-cs[k]))
-        cls[j].append(x)
-    return cls
-
-def recompute(cls,cs):
-    return [sum(c)/len(c) if c else cs[j] for j,c in enumerate(cls)]
-
-def kmeans(xs,k,it=100):
-    xs=sorted(xs)
-    step=max(1,len(xs)//k)
-    cs=[xs[min(i*step,len(xs)-1)] for i in range(k)]
-    for _ in range(it):
-        cls=assign(xs,cs)
-        new=recompute(cls,cs)
-        if all(abs(a-b)<1e-9 for a,b in zip(cs,new)): break
-        cs=new
-    return cs,cls
+import csv, json, sys, warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from optimal1d import optimal_1d
+
+# Lloyd k-means on an (n, d) array (a flat list is treated as n points in 1-D). Distances use
+# ||x||^2 - 2 x.c + ||c||^2, so assignment is one matrix product per block of rows, with blocks
+# sized to keep the (rows, k) distance block under BLOCK floats. Seeding is k-means++, and
+# n_init restarts run on threads (the heavy numpy calls release the GIL and X is shared, not
+# copied); the restart with the lowest inertia wins.
+#
+# algorithm="elkan" / "hamerly" keep triangle-inequality bounds so that most point-center
+# distances are never computed once the clustering settles. Elkan keeps an upper bound per
+# point and a lower bound per (point, center), which is n*k floats; it is on par with
+# Hamerly for k up to about 100 but, measured here, 1.4-1.7x slower than Hamerly for
+# k = 300-1000, so kmeans() warns past ELKAN_K centers or ELKAN_BYTES of bounds. Hamerly
+# keeps one lower bound per point (distance to the second-closest center), which is O(n)
+# memory and the faster choice for many centers (1.5-2x Lloyd for k = 300-1000). Both
+# return exactly Lloyd's fixed point.
+# algorithm="exact" (1-D data only) skips iterating altogether: optimal1d finds the globally
+# optimal clusters of the sorted points by dynamic programming.
+
+BLOCK = 1 << 22
+ONEHOT_K = 16
+GATHER = 8  # a gathered pair distance costs about this many matrix-product ones
+BATCH = 1024
+ELKAN_K = 256
+ELKAN_BYTES = 1 << 30
+
+def as_points(X):
+    X = np.asarray(X)
+    if X.dtype.kind != "f": X = X.astype(np.float64)
+    return X.reshape(-1, 1) if X.ndim == 1 else X
+
+def sq_norms(X): return np.einsum("ij,ij->i", X, X)
+
+def assign(X, cs, xx=None):
+    # -> (labels, squared distance to the nearest center)
+    xx = sq_norms(X) if xx is None else xx; cc = sq_norms(cs)
+    n = len(X); step = max(1, BLOCK // max(len(cs), 1))
+    labels = np.empty(n, dtype=np.int64); d2 = np.empty(n, dtype=X.dtype)
+    for a in range(0, n, step):
+        D = X[a:a+step] @ cs.T; D *= -2; D += cc; D += xx[a:a+step, None]
+        labels[a:a+step] = j = D.argmin(1)
+        d2[a:a+step] = np.maximum(D[np.arange(len(j)), j], 0)
+    return labels, d2
+
+def cluster_sums(X, labels, k):
+    # per-cluster coordinate sums and cluster sizes in O(n*d): each block of rows is grouped by
+    # a radix sort of its labels and every run is summed once. For k <= ONEHOT_K a one-hot
+    # matrix product is cheaper in practice, although it is O(n*k*d).
+    sums = np.zeros((k, X.shape[1]), dtype=np.float64); cnt = np.bincount(labels, minlength=k)
+    step = max(1, BLOCK // max(X.shape[1], k if k <= ONEHOT_K else 1))
+    small = np.int16 if k < 2**15 else np.int64
+    for a in range(0, len(X), step):
+        lb = labels[a:a+step]
+        if k <= ONEHOT_K: sums += (lb[:, None] == np.arange(k)).T.astype(X.dtype) @ X[a:a+step]; continue
+        G = X[a:a+step][np.argsort(lb.astype(small), kind="stable")]
+        c = np.bincount(lb, minlength=k); e = np.cumsum(c)
+        for j in np.nonzero(c)[0].tolist(): sums[j] += G[e[j]-c[j]:e[j]].sum(0, dtype=np.float64)
+    return sums, cnt
+
+def recompute(X, labels, cs):
+    # cluster means; an empty cluster keeps its previous center
+    sums, cnt = cluster_sums(X, labels, len(cs))
+    new = cs.copy(); nz = cnt > 0
+    new[nz] = sums[nz] / cnt[nz, None]
+    return new
+
+def kmeanspp(X, k, rng, xx=None):
+    # D^2 sampling: each next center is drawn with probability proportional to its squared
+    # distance from the centers picked so far
+    xx = sq_norms(X) if xx is None else xx; n = len(X)
+    idx = [int(rng.integers(n))]; d2 = np.maximum(xx - 2 * X @ X[idx[0]] + xx[idx[0]], 0)
+    for _ in range(1, k):
+        tot = d2.sum()
+        i = int(rng.integers(n)) if tot <= 0 else int(np.searchsorted(np.cumsum(d2), rng.random() * tot))
+        idx.append(min(i, n - 1)); d2 = np.minimum(d2, np.maximum(xx - 2 * X @ X[idx[-1]] + xx[idx[-1]], 0))
+    return X[idx].astype(X.dtype, copy=True)
+
+def info(r, n, k, done):
+    # distance counts include the initial full assignment
+    total = (r + 1) * n * k
+    return {"iterations": r, "distances": int(done), "skipped": int(total - done)}
+
+def lloyd(X, cs, it=100, tol=1e-9, xx=None):
+    # -> (centers, labels, inertia, info); stops when labels stop changing or centers
+    # move less than tol in total squared distance
+    xx = sq_norms(X) if xx is None else xx; labels, d2 = assign(X, cs, xx); r = 0
+    for r in range(1, it + 1):
+        new = recompute(X, labels, cs); shift = float(((new - cs) ** 2).sum()); cs = new
+        nl, d2 = assign(X, cs, xx); same = np.array_equal(nl, labels); labels = nl
+        if same or shift <= tol: break
+    return cs, labels, float(d2.sum()), info(r, len(X), len(cs), (r + 1) * len(X) * len(cs))
+
+def dists(X, cs, xx):
+    # (rows, k) euclidean distances of a block
+    D = X @ cs.T; D *= -2; D += sq_norms(cs); D += xx[:, None]
+    return np.sqrt(np.maximum(D, 0, out=D), out=D)
+
+def pair_dists(X, cs, rows, cols):
+    # exact ||X[rows[i]] - cs[cols[i]]||, gathered a bounded number of pairs at a time
+    out = np.empty(len(rows), dtype=X.dtype); step = max(1, BLOCK // X.shape[1])
+    for a in range(0, len(rows), step):
+        diff = X[rows[a:a+step]] - cs[cols[a:a+step]]
+        out[a:a+step] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    return out
+
+def half_gaps(cs):
+    # 0.5 * center-center distances, and s[j] = half the distance to j's nearest other center
+    G = 0.5 * dists(cs, cs, sq_norms(cs)); np.fill_diagonal(G, 0)
+    s = np.where(np.eye(len(cs), dtype=bool), np.inf, G).min(1) if len(cs) > 1 else np.full(1, np.inf)
+    return G, s
+
+def sse(X, cs, labels):
+    step = max(1, BLOCK // X.shape[1]); tot = 0.0
+    for a in range(0, len(X), step):
+        diff = X[a:a+step] - cs[labels[a:a+step]]; tot += float(np.einsum("ij,ij->", diff, diff))
+    return tot
+
+def elkan(X, cs, it=100, tol=1e-9, xx=None):
+    # L[i, j] stores the lower bound plus the total drift center j had when the bound was set,
+    # so decaying every bound by the centers' shifts is a k-vector update, not an n*k pass.
+    # A Hamerly-style bound l(i) on the distance to every other center screens points first,
+    # so settled points cost O(1) per iteration. For the rest, candidates come from each
+    # center's other centers sorted by half-gap: only the prefix with G[a, j] < u(i) can hold
+    # a closer center, found by one searchsorted per block. Blocks with many candidates (early
+    # iterations) skip the per-pair bounds and measure each row that still has a candidate by
+    # matrix product, counted as k distances per row.
+    xx = sq_norms(X) if xx is None else xx; n, k = len(X), len(cs); step = max(1, BLOCK // k)
+    L = np.empty((n, k), dtype=X.dtype)
+    for a in range(0, n, step): L[a:a+step] = dists(X[a:a+step], cs, xx[a:a+step])
+    labels = L.argmin(1); rr = np.arange(n); u = L[rr, labels]; drift = np.zeros(k); done = n * k; r = 0
+    l = np.partition(L, 1, axis=1)[:, 1] if k > 1 else np.full(n, np.inf, dtype=X.dtype)
+    for r in range(1, it + 1):
+        new = recompute(X, labels, cs); p = np.sqrt(((new - cs) ** 2).sum(1)); cs = new
+        drift += p; u += p[labels]; changed = 0
+        o = np.argsort(p)[::-1]; p1, p2 = p[o[0]], (p[o[1]] if k > 1 else 0.0)
+        l -= np.where(labels == o[0], p2, p1).astype(l.dtype)
+        G, s = half_gaps(cs); m = np.maximum(s[labels], l)
+        act = np.nonzero(u > m)[0]
+        if len(act):
+            ut = pair_dists(X, cs, act, labels[act]); done += len(act)
+            u[act] = ut; L[act, labels[act]] = ut + drift[labels[act]]; act = act[ut > m[act]]
+        if len(act):
+            order = np.argsort(G + np.diag(np.full(k, np.inf)), axis=1)[:, :k-1]
+            Gs = np.take_along_axis(G, order, 1); top = float(Gs.max()) + 1
+            flat = (Gs + top * np.arange(k)[:, None]).ravel()
+        for a in range(0, len(act), step):
+            b = act[a:a+step]; lb = labels[b]; ub = u[b]; nl = lb.copy(); best = ub.copy(); lo = l[b]
+            cnt = np.clip(np.searchsorted(flat, ub + top * lb) - lb * (k - 1), 0, k - 1)
+            if cnt.sum() * GATHER >= len(b) * k:
+                # rows with a center within the half-gap are measured in full; checking n*k
+                # bounds here would cost as much as measuring
+                tr = np.nonzero(cnt)[0]
+                if not len(tr): continue
+                D = dists(X[b[tr]], cs, xx[b[tr]]); done += D.size
+                j = D.argmin(1); t = np.arange(len(tr)); nl[tr] = j; best[tr] = d = D[t, j]
+                D[t, j] = np.inf; lo[tr] = D.min(1); D[t, j] = d; D += drift; L[b[tr]] = D
+            else:
+                rows = np.repeat(np.arange(len(b)), cnt)
+                jj = order[lb[rows], np.arange(len(rows)) - np.repeat(np.cumsum(cnt) - cnt, cnt)]
+                keep = L[b[rows], jj] - drift[jj] < ub[rows]; rows, jj = rows[keep], jj[keep]
+                if not len(rows): continue
+                d = pair_dists(X, cs, b[rows], jj); done += len(rows); L[b[rows], jj] = d + drift[jj]
+                np.minimum.at(best, rows, d); win = (d == best[rows]) & (d < ub[rows]); nl[rows[win]] = jj[win]
+                # the old center joins the others, which keeps l(i) a valid bound
+                mv = nl != lb; lo[mv] = np.minimum(lo[mv], ub[mv])
+            changed += int((nl != lb).sum()); labels[b] = nl; u[b] = best; l[b] = lo
+        if not changed or float((p ** 2).sum()) <= tol: break
+    return cs, labels, sse(X, cs, labels), info(r, n, k, done)
+
+def top2(X, cs, xx):
+    # -> (nearest center, its distance, distance to the second nearest), blockwise
+    n, k = len(X), len(cs); step = max(1, BLOCK // k)
+    a = np.empty(n, dtype=np.int64); u = np.empty(n, dtype=X.dtype); l = np.full(n, np.inf, dtype=X.dtype)
+    for s in range(0, n, step):
+        D = dists(X[s:s+step], cs, xx[s:s+step]); rr = np.arange(len(D))
+        a[s:s+step] = j = D.argmin(1); u[s:s+step] = D[rr, j]
+        if k > 1: D[rr, j] = np.inf; l[s:s+step] = D.min(1)
+    return a, u, l
+
+def hamerly(X, cs, it=100, tol=1e-9, xx=None):
+    xx = sq_norms(X) if xx is None else xx; n, k = len(X), len(cs); step = max(1, BLOCK // k)
+    labels, u, l = top2(X, cs, xx); done = n * k; r = 0
+    for r in range(1, it + 1):
+        new = recompute(X, labels, cs); p = np.sqrt(((new - cs) ** 2).sum(1)); cs = new
+        o = np.argsort(p)[::-1]; p1, p2 = p[o[0]], (p[o[1]] if k > 1 else 0.0)
+        u += p[labels]; l -= np.where(labels == o[0], p2, p1).astype(l.dtype)
+        _, s = half_gaps(cs); m = np.maximum(s[labels], l)
+        act = np.nonzero(u > m)[0]; changed = 0
+        if len(act):
+            ut = pair_dists(X, cs, act, labels[act]); done += len(act); u[act] = ut
+            act = act[ut > m[act]]
+            for a in range(0, len(act), step):
+                b = act[a:a+step]; nl, u[b], l[b] = top2(X[b], cs, xx[b]); done += len(b) * k
+                changed += int((nl != labels[b]).sum()); labels[b] = nl
+        if not changed or float((p ** 2).sum()) <= tol: break
+    return cs, labels, sse(X, cs, labels), info(r, n, k, done)
+
+ALGORITHMS = {"lloyd": lloyd, "elkan": elkan, "hamerly": hamerly}
+
+def kmeans(X, k, it=100, n_init=4, seed=None, workers=None, tol=1e-9, algorithm="lloyd", return_info=False):
+    # -> (centers, labels, inertia[, info]); centers are (k, d), or (k,) for 1-D input.
+    # info: iterations, distances computed and skipped for the winning restart
+    if algorithm not in ALGORITHMS and algorithm != "exact": raise ValueError("unknown algorithm: " + str(algorithm))
+    flat = np.ndim(X) == 1; X = as_points(X); n = len(X)
+    if not 0 < k <= n: raise ValueError("bad k")
+    if algorithm == "elkan" and (k > ELKAN_K or n * k * X.itemsize > ELKAN_BYTES):
+        warnings.warn(f"elkan keeps {n * k * X.itemsize / 2**20:.0f} MiB of bounds and is slower than "
+                      f"hamerly for k > {ELKAN_K}; use algorithm='hamerly'", RuntimeWarning, stacklevel=2)
+    if algorithm == "exact":
+        if X.shape[1] != 1: raise ValueError("exact mode needs 1-D data")
+        cs, labels, inertia = optimal_1d(X, k)
+        out = (cs if flat else cs.reshape(-1, 1)), labels, inertia
+        return out + ({"iterations": 0, "distances": 0, "skipped": 0},) if return_info else out
+    xx = sq_norms(X); seeds = np.random.SeedSequence(seed).spawn(max(1, n_init)); fit = ALGORITHMS[algorithm]
+    run = lambda ss: fit(X, kmeanspp(X, k, np.random.default_rng(ss), xx), it, tol, xx)
+    if workers and workers > 1 and len(seeds) > 1:
+        with ThreadPoolExecutor(workers) as ex: runs = list(ex.map(run, seeds))
+    else: runs = [run(ss) for ss in seeds]
+    cs, labels, inertia, st = min(runs, key=lambda r: r[2])
+    out = (cs.ravel() if flat else cs), labels, inertia
+    return out + (st,) if return_info else out
+
+def load_points(path):
+    if path.endswith(".npy"): return np.load(path, mmap_mode="r")
+    return json.load(open(path))
+
+def iter_batches(path, size=BATCH):
+    # (rows, d) float arrays of at most `size` points from .npy (memory-mapped), .csv (numeric
+    # columns; blank lines and a non-numeric first row are skipped, any other non-numeric or
+    # short row raises) or .jsonl (one point per line). A .json list can only be parsed whole,
+    # so it is refused rather than loaded.
+    if path.endswith(".json"): raise ValueError("a .json list cannot be streamed, use .jsonl, .csv or .npy")
+    if path.endswith(".npy"):
+        X = np.load(path, mmap_mode="r")
+        for a in range(0, len(X), size): yield as_points(np.array(X[a:a+size]))
+        return
+    buf = []
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            first, d = True, None
+            for r, row in enumerate(csv.reader(f), 1):
+                if not "".join(row).strip(): continue
+                try: pt = [float(v) for v in row]
+                except ValueError:
+                    if first: first = False; continue
+                    raise ValueError(f"{path}:{r}: non-numeric row {row}") from None
+                first = False; d = len(pt) if d is None else d
+                if len(pt) != d: raise ValueError(f"{path}:{r}: expected {d} columns, got {len(pt)}")
+                buf.append(pt)
+                if len(buf) >= size: yield as_points(buf); buf = []
+        else:
+            for l in f:
+                if l.strip(): buf.append(json.loads(l))
+                if len(buf) >= size: yield as_points(buf); buf = []
+    if buf: yield as_points(buf)
+
+class MiniBatchKMeans:
+    # Sculley's mini-batch k-means: each batch is assigned to the current centers and every
+    # center moves toward the mean of its new points with rate (its new points) / (all points
+    # it has absorbed), so early batches move centers a lot and later ones fine-tune them.
+    # State is k centers and k counts. The first batch (once it has k points) seeds the centers:
+    # n_init k-means++ starts refined by Lloyd on that batch alone, lowest inertia kept.
+    def __init__(s, k, seed=None, n_init=3):
+        s.k, s.n_init, s.rng, s.centers, s.counts, s.pending = k, n_init, np.random.default_rng(seed), None, None, []
+
+    def partial_fit(s, X):
+        X = as_points(X)
+        if s.centers is None:
+            s.pending.append(X); X = np.concatenate(s.pending)
+            if len(X) < s.k: return s
+            s.pending = []; xx = sq_norms(X)
+            runs = [lloyd(X, kmeanspp(X, s.k, s.rng, xx), xx=xx) for _ in range(max(1, s.n_init))]
+            s.centers = min(runs, key=lambda r: r[2])[0].astype(np.float64)
+            s.counts = np.zeros(s.k, dtype=np.int64)
+        labels, _ = assign(X, s.centers.astype(X.dtype, copy=False))
+        sums, m = cluster_sums(X, labels, s.k)
+        s.counts += m; nz = m > 0
+        s.centers[nz] += (sums[nz] - m[nz, None] * s.centers[nz]) / s.counts[nz, None]
+        return s
+
+    def fit(s, batches, epochs=1):
+        # batches: an iterable of arrays, or a callable returning a fresh one per epoch
+        for _ in range(epochs):
+            for X in (batches() if callable(batches) else batches): s.partial_fit(X)
+        return s
+
+    def predict(s, X): return assign(as_points(X), s.centers)[0]
+
+def minibatch(path, k, batch=BATCH, epochs=1, seed=None):
+    # streams the file `epochs` times; memory is O(batch * d + k * d)
+    return MiniBatchKMeans(k, seed).fit(lambda: iter_batches(path, batch), epochs)
 
 if __name__=="__main__":
+    # args: path k [n_init] [seed] [workers] [algorithm] -- "minibatch" streams the file,
+    # "exact" is the optimal 1-D clustering
     path=sys.argv[1]; k=int(sys.argv[2])
-    xs=json.load(open(path))
-    cs,cls=kmeans(xs,k)
-    print("Centers:",cs)
-    print("Clusters:",cls)
+    n_init=int(sys.argv[3]) if len(sys.argv)>3 else 4
+    seed=int(sys.argv[4]) if len(sys.argv)>4 else None
+    workers=int(sys.argv[5]) if len(sys.argv)>5 else None
+    algorithm=sys.argv[6] if len(sys.argv)>6 else "lloyd"
+    if algorithm=="minibatch":
+        model=minibatch(path,k,seed=seed)
+        print("Centers:",model.centers.tolist())
+        print("Counts:",model.counts.tolist())
+        sys.exit(0)
+    X=load_points(path)
+    cs,labels,inertia,st=kmeans(X,k,n_init=n_init,seed=seed,workers=workers,algorithm=algorithm,return_info=True)
+    X=np.asarray(X)
+    print("Centers:",cs.tolist())
+    print("Clusters:",[X[labels==j].tolist() for j in range(k)] if len(X)<=1000 else np.bincount(labels,minlength=k).tolist())
+    print("Inertia:",inertia)
+    print("Distances:",st["distances"],"skipped:",st["skipped"],"in",st["iterations"],"iterations")
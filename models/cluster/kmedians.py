@@ -1,38 +1,97 @@
-import json, sys
-
-def assign(xs, cs):
-    cls=[[] for _ in cs]
-    for x in xs:
-        j=min(range(len(cs)), key=lambda k: abs(x-cs[k]))
-        cls[j].append(x)
-    return cls
-
-def median(c):
-    if not c: return None
-    c=sorted(c); n=len(c); m=n//2
-    return c[m] if n%2 else 0.5*(c[m-1]+c[m])
-
-def recompute(cls, cs):
-    out=[]
-    for j,c in enumerate(cls):
-        m=median(c)
-        out.append(cs[j] if m is None else m)
-    return out
-
-def kmedians(xs, k, it=100):
-    xs=sorted(xs)
-    step=max(1, len(xs)//k)
-    cs=[xs[min(i*step, len(xs)-1)] for i in range(k)]  # simple deterministic init
-    for _ in range(it):
-        cls=assign(xs, cs)
-        new=recompute(cls, cs)
-        if all(abs(a-b)<1e-9 for a,b in zip(cs,new)): break
-        cs=new
-    return cs, cls
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from kmeans import BLOCK, as_points, load_points
+from optimal1d import optimal_1d
+
+# k-medians on an (n, d) array (a flat list is n points in 1-D): L1 assignment, coordinate-wise
+# median centers. Assignment runs over blocks of rows with one |x - c| reduction per center,
+# so the working set stays under BLOCK floats. Medians select the middle element(s) of each
+# coordinate with np.partition (O(size) per cluster, no full sort); points are grouped by
+# cluster with a radix sort of the labels. Seeding is D-sampling on L1 distance (k-median++),
+# and n_init restarts run on threads, keeping the lowest total distance.
+
+ROWS = 4096
+
+def l1_dists(X, cs):
+    # (rows, k) L1 distances; |x - c| is formed in a cache-sized scratch block reused for every
+    # center and row-summed by a matrix-vector product
+    dt = np.result_type(X, cs); D = np.empty((len(X), len(cs)), dtype=dt)
+    ones = np.ones(X.shape[1], dtype=dt); tmp = np.empty((min(ROWS, len(X)), X.shape[1]), dtype=dt)
+    for a in range(0, len(X), ROWS):
+        b = X[a:a+ROWS]; t = tmp[:len(b)]
+        for j, c in enumerate(cs):
+            np.subtract(b, c, out=t); np.abs(t, out=t); D[a:a+len(b), j] = t @ ones
+    return D
+
+def assign(X, cs):
+    # -> (labels, L1 distance to the nearest center)
+    n = len(X); step = max(1, BLOCK // max(len(cs), X.shape[1]))
+    labels = np.empty(n, dtype=np.int64); dist = np.empty(n, dtype=np.result_type(X, cs))
+    for a in range(0, n, step):
+        D = l1_dists(X[a:a+step], cs)
+        labels[a:a+step] = j = D.argmin(1); dist[a:a+step] = D[np.arange(len(j)), j]
+    return labels, dist
+
+def medians(X, labels, cs):
+    # coordinate-wise median per cluster; an empty cluster keeps its previous center
+    k = len(cs); order = np.argsort(labels.astype(np.int16 if k < 2**15 else np.int64), kind="stable")
+    cuts = np.cumsum(np.bincount(labels, minlength=k)); new = cs.copy(); a = 0
+    for j, b in enumerate(cuts.tolist()):
+        if b > a:
+            # one row per coordinate, so each partition runs over contiguous memory; for an even
+            # count the lower middle is the largest value left of the upper one
+            G = X[order[a:b]].T.copy(); h = (b - a) // 2; G.partition(h, axis=1)
+            new[j] = G[:, h] if (b - a) % 2 else 0.5 * (G[:, :h].max(1) + G[:, h])
+        a = b
+    return new
+
+def seed_l1(X, k, rng):
+    # k-median++: each next center is drawn with probability proportional to its L1 distance
+    # from the centers picked so far
+    n = len(X); idx = [int(rng.integers(n))]; d = l1_dists(X, X[idx[0]][None])[:, 0]
+    for _ in range(1, k):
+        tot = d.sum(dtype=np.float64)
+        i = int(rng.integers(n)) if tot <= 0 else int(np.searchsorted(np.cumsum(d, dtype=np.float64), rng.random() * tot))
+        idx.append(min(i, n - 1)); np.minimum(d, l1_dists(X, X[idx[-1]][None])[:, 0], out=d)
+    return X[idx].astype(X.dtype, copy=True)
+
+def lloyd(X, cs, it=100, tol=1e-9):
+    # -> (centers, labels, total L1 distance, iterations)
+    labels, dist = assign(X, cs); r = 0
+    for r in range(1, it + 1):
+        new = medians(X, labels, cs); shift = float(np.abs(new - cs).sum()); cs = new
+        nl, dist = assign(X, cs); same = np.array_equal(nl, labels); labels = nl
+        if same or shift <= tol: break
+    return cs, labels, float(dist.sum()), r
+
+def kmedians(X, k, it=100, n_init=4, seed=None, workers=None, tol=1e-9, algorithm="lloyd"):
+    # -> (centers, labels, cost); centers are (k, d), or (k,) for 1-D input.
+    # algorithm="exact": globally optimal L1 clusters of 1-D data (optimal1d)
+    if algorithm not in ("lloyd", "exact"): raise ValueError("unknown algorithm: " + str(algorithm))
+    flat = np.ndim(X) == 1; X = as_points(X); n = len(X)
+    if not 0 < k <= n: raise ValueError("bad k")
+    if algorithm == "exact":
+        if X.shape[1] != 1: raise ValueError("exact mode needs 1-D data")
+        cs, labels, cost = optimal_1d(X, k, l1=True)
+        return (cs if flat else cs.reshape(-1, 1)), labels, cost
+    seeds = np.random.SeedSequence(seed).spawn(max(1, n_init))
+    run = lambda ss: lloyd(X, seed_l1(X, k, np.random.default_rng(ss)), it, tol)
+    if workers and workers > 1 and len(seeds) > 1:
+        with ThreadPoolExecutor(workers) as ex: runs = list(ex.map(run, seeds))
+    else: runs = [run(ss) for ss in seeds]
+    cs, labels, cost, _ = min(runs, key=lambda r: r[2])
+    return (cs.ravel() if flat else cs), labels, cost
 
 if __name__=="__main__":
+    # args: path k [algorithm] [n_init] [seed]
     path=sys.argv[1]; k=int(sys.argv[2])
-    xs=json.load(open(path))
-    cs,cls=kmedians(xs,k)
-    print("Centers:", cs)
-    print("Clusters:", cls)
+    algorithm=sys.argv[3] if len(sys.argv)>3 else "lloyd"
+    n_init=int(sys.argv[4]) if len(sys.argv)>4 else 4
+    seed=int(sys.argv[5]) if len(sys.argv)>5 else None
+    X=load_points(path)
+    cs,labels,cost=kmedians(X,k,n_init=n_init,seed=seed,algorithm=algorithm)
+    X=np.asarray(X)
+    print("Centers:", cs.tolist())
+    print("Clusters:", [X[labels==j].tolist() for j in range(k)] if len(X)<=1000 else np.bincount(labels,minlength=k).tolist())
+    print("Total cost:", cost)
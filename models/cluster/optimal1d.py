@@ -0,0 +1,56 @@
+import numpy as np
+
+# Globally optimal 1-D clustering by dynamic programming over the sorted points (Ckmeans.1d.dp
+# style). Clusters of sorted data are contiguous runs, so with D[m][j] the best cost of
+# points 0..j in m+1 clusters, D[m][j] = min_i D[m-1][i-1] + cost(i, j). Any run's cost is
+# O(1) from prefix sums: SSE from sums and sums of squares, L1 from sums around the run's
+# median (the middle element). The best split i is monotone in j, so each layer is a
+# divide-and-conquer pass; all subproblems at the same recursion depth are evaluated in one
+# vectorized step, which gives O(k n log n) total work.
+
+def run_cost(S, S2, x, i, j, l1=False):
+    # cost of the runs x[i..j] (arrays of inclusive bounds)
+    c = j - i + 1; s = S[j+1] - S[i]
+    if not l1: return np.where(c > 1, np.maximum(S2[j+1] - S2[i] - s * s / c, 0), 0.0)
+    m = (i + j) // 2; med = x[m]
+    return med * (m - i) - (S[m] - S[i]) + (S[j+1] - S[m+1]) - med * (j - m)
+
+def layer(prev, S, S2, x, m, l1):
+    # D[m][j] for j >= m and the start of the last run, with prev = D[m-1]
+    n = len(x); cur = np.full(n, np.inf); opt = np.zeros(n, dtype=np.int64)
+    lo, hi, olo, ohi = (np.array([v]) for v in (m, n - 1, m, n - 1))
+    while len(lo):
+        mid = (lo + hi) // 2; a = olo; b = np.minimum(ohi, mid); lens = b - a + 1
+        starts = np.concatenate(([0], np.cumsum(lens)[:-1])); seg = np.repeat(np.arange(len(lo)), lens)
+        i = a[seg] + np.arange(lens.sum()) - starts[seg]; j = mid[seg]
+        val = prev[i - 1] + run_cost(S, S2, x, i, j, l1)
+        vmin = np.minimum.reduceat(val, starts)
+        best = np.minimum.reduceat(np.where(val == vmin[seg], i, n), starts)
+        cur[mid] = vmin; opt[mid] = best
+        L = lo <= mid - 1; R = mid + 1 <= hi
+        lo, hi, olo, ohi = (np.concatenate((lo[L], mid[R] + 1)), np.concatenate((mid[L] - 1, hi[R])),
+                            np.concatenate((olo[L], best[R])), np.concatenate((best[L], ohi[R])))
+    return cur, opt
+
+def optimal_1d(xs, k, l1=False):
+    # -> (centers ascending, labels in input order, total cost); SSE around cluster means, or
+    # with l1=True absolute deviation around cluster medians
+    xs = np.asarray(xs, dtype=np.float64).ravel(); n = len(xs)
+    if not 0 < k <= n: raise ValueError("bad k")
+    order = np.argsort(xs, kind="stable"); x = xs[order]
+    shift = x[n // 2]; x = x - shift  # centred prefix sums lose less precision
+    S = np.concatenate(([0.0], np.cumsum(x))); S2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    ar = np.arange(n); D = run_cost(S, S2, x, np.zeros(n, dtype=np.int64), ar, l1); starts = []
+    for m in range(1, k):
+        D, opt = layer(D, S, S2, x, m, l1); starts.append(opt)
+    # walk the split points back from the last point
+    bounds = [n]; j = n - 1
+    for opt in reversed(starts): i = int(opt[j]); bounds.append(i); j = i - 1
+    bounds.append(0); bounds = bounds[::-1]
+    cs = []; lab = np.empty(n, dtype=np.int64)
+    for c, (i, e) in enumerate(zip(bounds[:-1], bounds[1:])):
+        run = x[i:e]; lab[i:e] = c
+        if not l1: cs.append(run.mean())
+        else: h = len(run) // 2; cs.append(run[h] if len(run) % 2 else 0.5 * (run[h-1] + run[h]))
+    labels = np.empty(n, dtype=np.int64); labels[order] = lab
+    return np.array(cs) + shift, labels, float(D[n-1])
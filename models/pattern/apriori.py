@@ -1,40 +1,153 @@
-import json
-from itertools import combinations
+import sys
 from collections import defaultdict
+from txdb import TxDB, read, collapse, to_bits, bit_planes, plane_count
+from topk import TopK
 
-def apriori(transactions, min_support=0.5, min_conf=0.7):
-    n=len(transactions)
-    # L1
-    counts=defaultdict(int)
-    for t in transactions:
-        for i in t: counts[frozenset([i])]+=1
-    L={i:c/n for i,c in counts.items() if c/n>=min_support}
-    freq=[L]; allf=dict(L); k=2
-    while L:
-        C=[a|b for a in L for b in L if len(a|b)==k]
-        C=[c for c in set(C) if all(frozenset(s) in L for s in combinations(c,k-1))]
+# support counting backends: each takes the distinct baskets and their counts once
+# and returns count(C) -> {c: weighted support}
+
+def naive_counter(rows, w):
+    def count(C):
         counts=defaultdict(int)
-        for t in transactions:
+        for t,k in zip(rows,w):
             for c in C:
-                if c.issubset(t): counts[c]+=1
-        L={c:v/n for c,v in counts.items() if v/n>=min_support}
-        allf.update(L)
-        if L: freq.append(L)
-        k+=1
-    rules=[]
+                if c.issubset(t): counts[c]+=k
+        return counts
+    return count
+
+def trie_counter(rows, w):
+    rows=[(sorted(t),k) for t,k in zip(rows,w)]
+    def count(C):
+        counts=defaultdict(int)
+        if not C: return counts
+        k=len(next(iter(C)))
+        # prefix trie over sorted candidates, leaves hold the candidate itself
+        root={}
+        for c in C:
+            *pre,last=sorted(c); node=root
+            for i in pre: node=node.setdefault(i,{})
+            node[last]=c
+        # items outside every candidate can never be frequent again -> shrink rows for good
+        alive=set().union(*C)
+        rows[:]=[(r,x) for r,x in (([i for i in r if i in alive],x) for r,x in rows) if len(r)>=k]
+        def walk(node,t,s,d,x):
+            for j in range(s,len(t)-k+d):
+                ch=node.get(t[j])
+                if ch is None: continue
+                if d==k: counts[ch]+=x
+                else: walk(ch,t,j+1,d+1,x)
+        for t,x in rows: walk(root,t,0,1,x)
+        return counts
+    return count
+
+def bitmap_counter(rows, w):
+    tids=defaultdict(list)
+    for tid,t in enumerate(rows):
+        for i in t: tids[i].append(tid)
+    bits={i:to_bits(T,len(rows)) for i,T in tids.items()}
+    planes=bit_planes(w)
+    pop=int.bit_count if len(planes)==1 else (lambda b: plane_count(planes,b))
+    def count(C):
+        counts={}
+        for c in C:
+            it=iter(c); b=bits[next(it)]
+            for i in it:
+                b&=bits[i]
+                if not b: break
+            if b: counts[c]=pop(b)
+        return counts
+    return count
+
+COUNTERS={"naive":naive_counter,"trie":trie_counter,"bitmap":bitmap_counter}
+
+def count_sets(rows, w, sets, counter="trie"):
+    # one-off counting of itemsets of mixed sizes, one backend pass per size
+    by_len=defaultdict(list)
+    for X in sets: by_len[len(X)].append(X)
+    out={}
+    for C in by_len.values(): out.update(COUNTERS[counter](rows,w)(C))
+    return out
+
+def prefix_join(S):
+    # S: sorted list of equal-length sorted tuples; join pairs sharing all but the last item,
+    # keep a join only if every other (k-1)-subset is in S too
+    keys=set(S); out=[]; i=0
+    while i<len(S):
+        j=i; pre=S[i][:-1]
+        while j<len(S) and S[j][:-1]==pre: j+=1
+        for a in range(i,j):
+            for b in range(a+1,j):
+                c=S[a]+(S[b][-1],)
+                if all(c[:m]+c[m+1:] in keys for m in range(len(c)-2)): out.append(c)
+        i=j
+    return out
+
+def gen_candidates(L):
+    return [frozenset(c) for c in prefix_join(sorted(tuple(sorted(c)) for c in L))]
+
+def iter_rules(allf, min_conf=0.7):
+    # yields (X, Y, sup, conf); consequents only grow from ones that passed min_conf,
+    # since conf(X-y -> Y+y) <= conf(X -> Y)
     for iset,sup in allf.items():
         if len(iset)<2: continue
-        for r in range(1,len(iset)):
-            for X in combinations(iset,r):
-                X=frozenset(X); Y=iset-X
-                if allf[X]>0:
-                    conf=sup/allf[X]
-                    if conf>=min_conf: rules.append((set(X),set(Y),sup,conf))
-    return freq,rules
+        H=[(i,) for i in sorted(iset)]
+        while H and len(H[0])<len(iset):
+            keep=[]
+            for Y in H:
+                X=iset.difference(Y); conf=sup/allf[X]
+                if conf>=min_conf:
+                    keep.append(Y); yield set(X),set(Y),sup,conf
+            H=prefix_join(keep)
+
+def apriori(transactions, min_support=0.5, min_conf=0.7, counter="trie", stream=False, weighted=False,
+            topk=None, max_len=None):
+    # weighted: transactions are (items, count) pairs; identical baskets are merged either way
+    # topk: the topk most frequent itemsets, min_support is ignored; max_len caps the levels
+    if isinstance(transactions, TxDB):
+        # mine on int ids, decode only the output
+        db=transactions; dec=lambda c: frozenset(db.decode(c))
+        freq,rules=apriori(list(db.pairs()),min_support,min_conf,counter,True,True,topk,max_len)
+        freq=[{dec(c):v for c,v in L.items()} for L in freq]
+        rules=((set(dec(X)),set(dec(Y)),sup,conf) for X,Y,sup,conf in rules)
+        return freq,(rules if stream else list(rules))
+    rows,w=collapse(transactions,weighted)
+    n=sum(w)
+    if counter not in COUNTERS: raise ValueError("unknown counter: "+str(counter))
+    count=COUNTERS[counter](rows,w)
+    # L1
+    counts=defaultdict(int)
+    for t,k in zip(rows,w):
+        for i in t: counts[frozenset([i])]+=k
+    if topk:
+        tk=TopK(topk); tk.seed(counts.values())
+        for v in counts.values(): tk.push(v)
+        keep=lambda v: v>=tk.border()
+    else: keep=lambda v: v/n>=min_support
+    L={i:c/n for i,c in counts.items() if keep(c)}
+    freq=[L]; allf=dict(L); k=1
+    while L and (not max_len or k<max_len):
+        C=gen_candidates(L)
+        counts=count(C)
+        if topk:
+            for v in counts.values(): tk.push(v)
+        L={c:v/n for c,v in counts.items() if keep(v)}
+        allf.update(L); k+=1
+        if L: freq.append(L)
+    if topk:
+        # levels were cut at the border of their time; cut them again at the final one
+        b=tk.border()/n
+        freq=[L for i,L in enumerate({c:v for c,v in L.items() if v>=b} for L in freq) if L or i==0]
+        allf={c:v for c,v in allf.items() if v>=b}
+    rules=iter_rules(allf,min_conf)
+    return freq,(rules if stream else list(rules))
 
 if __name__=="__main__":
-    with open("db/tx.json") as f: 
-        tx=json.load(f)
-    freq,rules=apriori([set(t) for t in tx],0.5,0.7)
+    path=sys.argv[1] if len(sys.argv)>1 else "db/raw/tx.json"
+    minsup=float(sys.argv[2]) if len(sys.argv)>2 else 0.5
+    minconf=float(sys.argv[3]) if len(sys.argv)>3 else 0.7
+    counter=sys.argv[4] if len(sys.argv)>4 else "trie"
+    tx=read(path)
+    freq,rules=apriori(tx if isinstance(tx,TxDB) else [set(t) for t in tx],minsup,minconf,counter,stream=True)
     print("Frequent:",freq)
-    print("Rules:",rules)
+    print("Rules:")
+    for r in rules: print(r)
@@ -0,0 +1,67 @@
+import json, os, sys, time, platform, tracemalloc
+from apriori import apriori
+from eclat import eclat
+from fp_growth import fpgrowth
+from hmine import hmine_mine
+from txdb import TxDB, read
+
+# Times every miner on one dataset across support thresholds, measures peak traced memory in a
+# second run, and checks that all miners return the same itemsets and supports. Each
+# (miner, minsup) run becomes one JSON line appended to the results file, so runs over time
+# can be diffed. Exits non-zero when the miners disagree.
+
+MINERS = {
+    "ap": lambda tx, ms: [(X, v) for L in apriori(tx, ms, stream=True)[0] for X, v in L.items()],
+    "fp": fpgrowth, "ec": eclat, "hm": hmine_mine,
+}
+
+def canon(res): return {frozenset(X): round(v, 9) for X, v in res}
+
+def dataset_stats(tx):
+    if isinstance(tx, TxDB):
+        return {"transactions": tx.total(), "distinct": len(tx), "items": len(tx.items),
+                "avg_len": float(sum(len(r) * k for r, k in tx.pairs()) / max(tx.total(), 1))}
+    return {"transactions": len(tx), "items": len({i for t in tx for i in t}),
+            "avg_len": sum(map(len, tx)) / max(len(tx), 1)}
+
+def run_one(fn, tx, ms, repeat=1):
+    # -> (result, best wall seconds, peak traced MiB); the traced run is extra, not timed
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter(); res = fn(tx, ms); best = min(best, time.perf_counter() - t)
+    tracemalloc.start()
+    try: fn(tx, ms); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    return res, best, peak / 2**20
+
+def bench(tx, thresholds, miners=None, repeat=1):
+    # -> list of records; "match" compares against the first miner at the same threshold
+    miners = miners or list(MINERS); out = []
+    for ms in thresholds:
+        ref = None
+        for name in miners:
+            if name not in MINERS: raise ValueError("unknown miner: " + str(name))
+            res, sec, peak = run_one(MINERS[name], tx, ms, repeat); got = canon(res)
+            if ref is None: ref = got
+            out.append({"miner": name, "minsup": ms, "seconds": round(sec, 6), "peak_mb": round(peak, 3),
+                        "itemsets": len(got), "match": got == ref, "diff": len(set(got.items()) ^ set(ref.items()))})
+    return out
+
+if __name__ == "__main__":
+    # args: path minsups(comma separated) [miners(comma separated)] [repeat] [outfile]
+    path = sys.argv[1]
+    thresholds = [float(x) for x in sys.argv[2].split(",")] if len(sys.argv) > 2 else [0.1, 0.05]
+    miners = sys.argv[3].split(",") if len(sys.argv) > 3 else None
+    repeat = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    outfile = sys.argv[5] if len(sys.argv) > 5 else "db/bench.jsonl"
+
+    tx = read(path); meta = {"run": time.strftime("%Y-%m-%dT%H:%M:%S"), "dataset": path,
+                             "python": platform.python_version(), **dataset_stats(tx)}
+    recs = bench(tx, thresholds, miners, repeat)
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    with open(outfile, "a") as f:
+        for r in recs: f.write(json.dumps({**meta, **r}) + "\n")
+    print(f"{'miner':<6}{'minsup':>9}{'seconds':>11}{'peak_mb':>10}{'itemsets':>10}  match")
+    for r in recs: print(f"{r['miner']:<6}{r['minsup']:>9}{r['seconds']:>11.4f}{r['peak_mb']:>10.2f}{r['itemsets']:>10}  {r['match']}")
+    print(f"Appended {len(recs)} records -> {outfile}")
+    sys.exit(0 if all(r["match"] for r in recs) else 1)
@@ -0,0 +1,31 @@
+from collections import defaultdict
+
+# stored itemsets with an item -> ids hash index per bucket, so "is X inside a stored set"
+# intersects a few id sets instead of scanning; bucket by support for closed sets, None for maximal
+
+class SupersetIndex:
+    def __init__(s): s.sets, s.idx = [], defaultdict(dict)
+
+    def add(s, X, sup, key=None):
+        k = len(s.sets); s.sets.append((sorted(X), sup)); b = s.idx[key]
+        for i in X: b.setdefault(i, set()).add(k)
+
+    def supersets(s, X, key=None):
+        b = s.idx.get(key)
+        if not b: return set()
+        ids = [b.get(i) for i in set(X)]
+        if not ids: return set().union(*b.values())
+        if any(l is None for l in ids): return set()
+        ids.sort(key=len); out = set(ids[0])
+        for l in ids[1:]:
+            out &= l
+            if not out: break
+        return out
+
+    def covers(s, X, key=None): return bool(s.supersets(X, key))
+
+def support_of(closed, X):
+    # support of any frequent itemset = highest support among the closed sets containing it
+    idx = SupersetIndex()
+    for C, sup in closed: idx.add(C, sup)
+    return max((idx.sets[k][1] for k in idx.supersets(X)), default=0)
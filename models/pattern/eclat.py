@@ -1,35 +1,177 @@
-import json, sys
+import sys, math
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from txdb import TxDB, read, collapse, to_bits, bit_planes, plane_count
+from closed import SupersetIndex
+from topk import TopK, best
 
-def vertical_format(transactions):
+# auto mode switches to diffsets once the average frequent item covers this share of transactions
+DIFFSET_DENSITY = 0.5
+
+def vertical_format(transactions, bits=False):
     V = defaultdict(set)
     for tid, t in enumerate(transactions):
         for item in set(t):
             V[frozenset([item])].add(tid)
+    if bits:
+        n = len(transactions)
+        return {Q: to_bits(T, n) for Q, T in V.items()}
     return V
 
-def eclat(transactions, minsup):
-    n = len(transactions)
-    m = int(minsup * n) if 0 < minsup <= 1 else int(minsup)
-    V = vertical_format(transactions)
-    res = []
-
-    def dfs(P, T, tail):
-        if len(T) >= m:
-            res.append((sorted(P), len(T)/n))
-        for i, (Q, U) in enumerate(tail):
-            IU = T & U
-            if len(IU) >= m:
-                dfs(P | Q, IU, tail[i+1:])
-
-    items = sorted(V.items(), key=lambda kv: (-len(kv[1]), next(iter(kv[0]))))
-    for i, (Q, T) in enumerate(items):
-        if len(T) >= m:
-            dfs(Q, T, items[i+1:])
+def density(sups, n, m):
+    sizes = [s for s in sups if s >= m]
+    return sum(sizes) / (len(sizes) * n) if sizes and n else 0.0
+
+def wsum(w, T): return sum(w[t] for t in T)
+
+def extend(X, sx, tail, top, m, diff, cnt):
+    # class of x's frequent extensions: [(item, tidset or diffset, support)]
+    nxt = []
+    for y, Y, sy in tail:
+        if diff:
+            # d(xy) = t(x) \ t(y) on the first level, d(Pxy) = d(Py) \ d(Px) below it
+            Z = X & ~Y if top else Y & ~X; s = sx - cnt(Z)
+        else:
+            Z = X & Y; s = cnt(Z)
+        if s >= m: nxt.append((y, Z, s))
+    return nxt
+
+def dfs(P, cls, top, ctx, res):
+    m, n, diff, cnt = ctx
+    for i, (x, X, sx) in enumerate(cls):
+        Px = P + [x]; res.append((sorted(Px), sx/n))
+        nxt = extend(X, sx, cls[i+1:], top, m, diff, cnt)
+        if nxt: dfs(Px, nxt, False, ctx, res)
+
+def charm(P, cls, ctx, store):
+    # CHARM over tidsets: cls is [(items, tidset, support)] in increasing support order.
+    # store maps tidset -> (items, support); itemsets sharing a tidset share one closure,
+    # so uniting them there is the subsumption check.
+    m, n, _, cnt = ctx
+    cls = list(cls); i = 0
+    while i < len(cls):
+        Xi, Ti, si = cls[i]; X = list(Xi); new = []; j = i + 1
+        while j < len(cls):
+            Xj, Tj, sj = cls[j]; Y = Ti & Tj
+            if Y == Ti:
+                X += Xj  # t(Xi) within t(Xj): Xj belongs to every closure of Xi
+                if Y == Tj: del cls[j]; continue
+            elif Y == Tj:
+                del cls[j]; new.append((Xj, Y, sj)); continue
+            else:
+                s = cnt(Y)
+                if s >= m: new.append((Xj, Y, s))
+            j += 1
+        Px = P + X
+        if new: charm(Px, sorted(new, key=lambda e: e[2]), ctx, store)
+        key = frozenset(Ti) if isinstance(Ti, set) else Ti
+        C = store.get(key); store[key] = (C[0] | set(Px) if C else set(Px), si)
+        i += 1
+
+def genmax(P, cls, top, ctx, mfi):
+    # maximal sets: a leaf not covered by an earlier maximal set is maximal, and once
+    # P + x + everything after x is covered the rest of this class can be skipped
+    m, n, diff, cnt = ctx
+    for i, (x, X, sx) in enumerate(cls):
+        Px = P + [x]
+        if mfi.covers(Px + [y for y, _, _ in cls[i+1:]]): return
+        nxt = extend(X, sx, cls[i+1:], top, m, diff, cnt)
+        if nxt: genmax(Px, nxt, False, ctx, mfi)
+        elif not mfi.covers(Px): mfi.add(Px, sx)
+
+def topk_dfs(P, cls, top, ctx, tk, max_len, res):
+    # like dfs, but the threshold is the rising top-k border and depth stops at max_len
+    _, n, diff, cnt = ctx
+    for i, (x, X, sx) in enumerate(cls):
+        if sx < tk.border(): continue
+        Px = P + [x]; tk.push(sx); res.append((sorted(Px), sx))
+        if max_len and len(Px) >= max_len: continue
+        nxt = extend(X, sx, cls[i+1:], top, tk.border(), diff, cnt)
+        if nxt: topk_dfs(Px, nxt, False, ctx, tk, max_len, res)
+
+# parallel mode: one job per member of the top class; a member whose own class has more than
+# SPLIT extensions is not mined in place but handed back as one job carrying that class once,
+# with the index range of members to mine (its members split further the same way)
+SPLIT = 32
+_top = _ctx = None
+
+def _init(cls, ctx):
+    global _top, _ctx; _top, _ctx = cls, ctx
+
+def _job(job):
+    # -> ({DFS path: results}, split-off jobs)
+    key, P, cls, lo, hi, top = job
+    if cls is None: cls = _top
+    m, n, diff, cnt = _ctx; parts, more = {}, []
+    for i in range(lo, hi):
+        x, X, sx = cls[i]; Px = P + [x]; k = key + (i,)
+        res = parts[k] = [(sorted(Px), sx/n)]
+        nxt = extend(X, sx, cls[i+1:], top, m, diff, cnt)
+        if len(nxt) > SPLIT: more.append((k, Px, nxt, 0, len(nxt), False))
+        elif nxt: dfs(Px, nxt, False, _ctx, res)
+    return parts, more
+
+def parallel_dfs(cls, ctx, workers):
+    # the top class is installed once per worker; each split-off class travels once, with its
+    # job (tidsets as packed ints). Job keys are DFS paths, so sorting them gives the serial order.
+    parts = {}
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(cls, ctx)) as ex:
+        pending = {ex.submit(_job, ((), [], None, i, i + 1, True)) for i in range(len(cls))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                got, more = f.result(); parts.update(got)
+                pending |= {ex.submit(_job, j) for j in more}
+    return [r for key in sorted(parts) for r in parts[key]]
 
+def eclat(transactions, minsup, mode="auto", workers=None, weighted=False, closed=False, maximal=False,
+          topk=None, max_len=None):
+    # mode: "set" (python sets), "bitset" (packed int tidsets), "diffset" (dEclat over bitsets), "auto"
+    # weighted: transactions are (items, count) pairs; identical baskets are merged either way,
+    # so tids index distinct baskets and supports are weighted by their counts
+    # closed / maximal: only closed (CHARM) or maximal (GenMax-style) itemsets, mined serially;
+    # closed mining keys its store by tidset, so it runs on tidsets rather than diffsets
+    # topk: the topk most frequent itemsets of at most max_len items, minsup is ignored (serial)
+    if closed and maximal: raise ValueError("pick one of closed / maximal")
+    if (closed or maximal or topk) and workers and workers > 1: raise ValueError("closed / maximal / topk mining is serial")
+    if isinstance(transactions, TxDB): V, w = transactions.vertical(), transactions.counts_list()
+    else:
+        rows, w = collapse(transactions, weighted); V = vertical_format(rows)
+    n = sum(w); N = len(w)
+    m = math.ceil(minsup * n) if 0 < minsup <= 1 else int(minsup)
+    unit = all(k == 1 for k in w)
+    sup = {Q: len(T) if unit else wsum(w, T) for Q, T in V.items()}
+    if topk:
+        tk = TopK(topk); tk.seed(sup.values()); m = tk.border()
+    if mode == "auto": mode = "diffset" if density(sup.values(), n, m) >= DIFFSET_DENSITY else "bitset"
+    if closed and mode == "diffset": mode = "bitset"
+    if mode not in ("set", "bitset", "diffset"): raise ValueError("unknown mode: " + str(mode))
+    if mode == "set": cnt = len if unit else partial(wsum, w)
+    else: cnt = int.bit_count if unit else partial(plane_count, bit_planes(w))
+    items = sorted(V.items(), key=lambda kv: (-sup[kv[0]], next(iter(kv[0]))))
+    cls = [(next(iter(Q)), T if mode == "set" else to_bits(T, N), sup[Q]) for Q, T in items if sup[Q] >= m]
+    ctx = (m, n, mode == "diffset", cnt)
+    if topk:
+        res = []; topk_dfs([], cls, True, ctx, tk, max_len, res); res = best(res, tk, n)
+    elif closed:
+        store = {}
+        charm([], [((x,), T, s) for x, T, s in reversed(cls)], ctx, store)
+        res = [(sorted(C), s/n) for C, s in store.values()]
+    elif maximal:
+        mfi = SupersetIndex(); genmax([], cls[::-1], True, ctx, mfi)
+        res = [(C, s/n) for C, s in mfi.sets]
+    elif workers and workers > 1: res = parallel_dfs(cls, ctx, workers)
+    else:
+        res = []
+        dfs([], cls, True, ctx, res)
+    if isinstance(transactions, TxDB): res = [(sorted(transactions.decode(P)), s) for P, s in res]
     return res
 
 if __name__ == "__main__":
-    path, minsup = sys.argv[1], float(sys.argv[2])
-    with open(path) as f: tx = json.load(f)
-    print(eclat(tx, minsup))
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}; argv = [a for a in sys.argv if a not in flags]
+    path, minsup = argv[1], float(argv[2])
+    mode = argv[3] if len(argv) > 3 else "auto"
+    workers = int(argv[4]) if len(argv) > 4 else None
+    tx = read(path)
+    print(eclat(tx, minsup, mode, workers, closed="--closed" in flags, maximal="--maximal" in flags))
@@ -1,53 +1,132 @@
-import json, sys, math
+import sys, math
 from collections import Counter
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from txdb import TxDB, read, collapse
+from closed import SupersetIndex
 
 class Node:
-    def __init__(s, i, p): s.item, s.count, s.parent = i, 1, p; s.children, s.next = {}, None
-
-def build_tree(txns, m):
-    c = Counter(i for t in txns for i in set(t))
-    it = [i for i,v in c.items() if v >= m]
-    o = {i:j for j,i in enumerate(sorted(it, key=lambda x: (-c[x], x)))}
-    h = {i: None for i in it}; r = Node(None, None)
-    for t in txns:
-        f = sorted([i for i in t if i in it], key=lambda x: o[x]); n = r
-        for i in f:
-            if i not in n.children:
-                ch = Node(i, n); n.children[i] = ch
-                if not h[i]: h[i] = ch
-                else:
-                    cur = h[i]
-                    while cur.next: cur = cur.next
-                    cur.next = ch
-            else: n.children[i].count += 1
-            n = n.children[i]
+    __slots__ = ("item", "count", "parent", "children", "next")
+    def __init__(s, i, p, c=1): s.item, s.count, s.parent = i, c, p; s.children, s.next = {}, None
+
+def build_tree(paths, m):
+    # paths: (items, count) pairs; header entries are [head, tail] of the node-link chain
+    c = Counter()
+    for t, k in paths:
+        for i in set(t): c[i] += k
+    o = {i:j for j,i in enumerate(sorted((i for i,v in c.items() if v >= m), key=lambda x: (-c[x], x)))}
+    h = {i: [None, None] for i in o}; r = Node(None, None, 0)
+    for t, k in paths:
+        n = r
+        for i in sorted((i for i in set(t) if i in o), key=o.get):
+            ch = n.children.get(i)
+            if ch is None:
+                ch = n.children[i] = Node(i, n, k); e = h[i]
+                if e[1] is None: e[0] = ch
+                else: e[1].next = ch
+                e[1] = ch
+            else: ch.count += k
+            n = ch
     return r, h
 
 def ascend(n):
-    p = []
-    while n.parent and n.parent.item:
-        n = n.parent; p.append(n.item)
+    p = []; n = n.parent
+    while n.parent is not None:
+        p.append(n.item); n = n.parent
     return p[::-1]
 
+def cond_base(node):
+    s, db = 0, []
+    while node:
+        s += node.count; path = ascend(node)
+        if path: db.append((path, node.count))
+        node = node.next
+    return s, db
+
+def single_path(r):
+    p = []
+    while r.children:
+        if len(r.children) > 1: return None
+        r = next(iter(r.children.values())); p.append((r.item, r.count))
+    return p
+
+def grow(r, h, m, p, res, n):
+    sp = single_path(r)
+    if sp is None: return mine(h, m, p, res, n)
+    # every combination of a single path is frequent; its support is that of its deepest node
+    for k in range(1, len(sp) + 1):
+        for comb in combinations(sp, k):
+            res.append((p + [i for i, _ in comb], comb[-1][1] / n))
+
+def mine_item(i, s, db, m, p, res, n):
+    newp = p + [i]; res.append((newp, s / n))
+    if db:
+        r, h2 = build_tree(db, m)
+        if h2: grow(r, h2, m, newp, res, n)
+
 def mine(h, m, p, res, n):
-    for i, node in h.items():
-        s, db = 0, []
-        cur = node
-        while cur:
-            s += cur.count; db += [ascend(cur)] * cur.count; cur = cur.next
-        if s >= m:
-            newp = p + [i]; res.append((newp, s / n))
-            if db:
-                r, h2 = build_tree(db, m)
-                if h2: mine(h2, m, newp, res, n)
-
-def fpgrowth(txns, minsup):
-    n = len(txns); m = int(math.ceil(minsup * n))
-    _, h = build_tree([set(t) for t in txns], m)
-    res = []; mine(h, m, [], res, n)
+    for i, (node, _) in h.items():
+        s, db = cond_base(node)
+        if s >= m: mine_item(i, s, db, m, p, res, n)
+
+def mine_cm(h, m, p, store, maximal):
+    # FPClose / FPMax: items are taken least frequent first, so any superset of a pattern
+    # is met before the pattern itself and one store lookup decides it
+    for i, (node, _) in reversed(list(h.items())):
+        s, db = cond_base(node)
+        if s < m: continue
+        c = Counter()
+        for path, k in db:
+            for j in path: c[j] += k
+        freq = [j for j, v in c.items() if v >= m]; newp = p + [i]
+        if maximal:
+            if store.covers(newp + freq): continue  # the whole conditional tree is already covered
+        else:
+            # items in every transaction of the base belong to the closure of newp
+            full = [j for j in freq if c[j] == s]; newp += full; full = set(full)
+            if store.covers(newp, s): continue
+            db = [(u, k) for u, k in (([j for j in t if j not in full], k) for t, k in db) if u]
+        r, h2 = build_tree(db, m) if db else (None, {})
+        if maximal:
+            # newp + freq was not covered, so a leaf or a single path is maximal as it stands
+            sp = single_path(r) if h2 else []
+            if sp is None: mine_cm(h2, m, newp, store, maximal)
+            else: store.add(newp + [j for j, _ in sp], sp[-1][1] if sp else s)
+        else:
+            store.add(newp, s, s)
+            if h2: mine_cm(h2, m, newp, store, maximal)
+
+def _mine_job(job):
+    i, s, db, m, n = job; res = []
+    mine_item(i, s, db, m, [], res, n)
+    return res
+
+def fpgrowth(txns, minsup, workers=None, weighted=False, closed=False, maximal=False):
+    # weighted: txns are (items, count) pairs; identical baskets are merged either way
+    # closed / maximal: only closed (FPClose) or maximal (FPMax) itemsets, mined serially
+    if closed and maximal: raise ValueError("pick one of closed / maximal")
+    if (closed or maximal) and workers and workers > 1: raise ValueError("closed / maximal mining is serial")
+    if isinstance(txns, TxDB):
+        return [(txns.decode(p), s) for p, s in fpgrowth(list(txns.pairs()), minsup, workers, True, closed, maximal)]
+    rows, w = collapse(txns, weighted)
+    n = sum(w); m = int(math.ceil(minsup * n))
+    _, h = build_tree(list(zip(rows, w)), m)
+    if closed or maximal:
+        store = SupersetIndex(); mine_cm(h, m, [], store, maximal)
+        return [(C, s / n) for C, s in store.sets]
+    res = []
+    if not workers or workers <= 1:
+        mine(h, m, [], res, n)
+        return res
+    # one job per header item, merged back in header order -> same output as the serial run
+    jobs = [(i, *cond_base(node), m, n) for i, (node, _) in h.items()]
+    with ProcessPoolExecutor(workers) as ex:
+        for part in ex.map(_mine_job, jobs): res += part
     return res
 
 if __name__ == "__main__":
-    path = sys.argv[1]; minsup = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
-    with open(path) as f: tx = json.load(f)
-    print("Frequent:", fpgrowth(tx, minsup))
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}; argv = [a for a in sys.argv if a not in flags]
+    path = argv[1]; minsup = float(argv[2]) if len(argv) > 2 else 0.5
+    workers = int(argv[3]) if len(argv) > 3 else None
+    tx = read(path)
+    print("Frequent:", fpgrowth(tx, minsup, workers, closed="--closed" in flags, maximal="--maximal" in flags))
@@ -0,0 +1,85 @@
+import json, os, sys
+from collections import defaultdict
+from apriori import count_sets, gen_candidates, iter_rules
+from txdb import TxDB, read, collapse
+
+# Incremental apriori (FUP with a negative border). The state keeps support counts for every
+# frequent itemset, every itemset on the negative border and every single item, over n
+# transactions. An appended batch is counted only against those itemsets. Only when an
+# itemset is promoted and the border grows past what is stored do the new border sets need
+# the old transactions.
+
+def new_state(min_support): return {"n": 0, "min_support": min_support, "counts": {}}
+
+def pairs(txns, weighted=False):
+    # TxDB ids are per store, so decode them before they meet another batch
+    if isinstance(txns, TxDB): return collapse(((txns.decode(r), k) for r, k in txns.pairs()), True)
+    return collapse(txns, weighted)
+
+def border(F):
+    # sets of 2+ items that are not frequent but whose (k-1)-subsets all are
+    levels = defaultdict(list)
+    for X in F: levels[len(X)].append(X)
+    return {c for k in levels for c in gen_candidates(levels[k]) if c not in F}
+
+def frequent_sets(state):
+    n, ms = state["n"], state["min_support"]
+    return {X for X, v in state["counts"].items() if n and v/n >= ms}
+
+def update(state, delta, old=None, weighted=False, counter="trie"):
+    # state: previous run over `old`; delta: the appended batch. Returns the new state.
+    rows, w = pairs(delta, weighted)
+    n = state["n"] + sum(w); ms = state["min_support"]; counts = dict(state["counts"])
+    # every single item (new items included) and every stored itemset, against the delta only
+    for t, k in zip(rows, w):
+        for i in t:
+            X = frozenset([i]); counts[X] = counts.get(X, 0) + k
+    for X, v in count_sets(rows, w, [X for X in counts if len(X) > 1], counter).items(): counts[X] += v
+    # promotions can open border sets nobody has counted: count those over old + delta
+    full = None
+    while True:
+        F = {X for X, v in counts.items() if n and v/n >= ms}
+        new = [X for X in border(F) if X not in counts]
+        if not new: break
+        if full is None:
+            if state["n"] and old is None: raise ValueError("promoted itemsets need the old transactions")
+            orows, ow = pairs(old, weighted) if state["n"] else ([], [])
+            full = collapse(list(zip(orows, ow)) + list(zip(rows, w)), True)
+        for X in new: counts[X] = 0
+        for X, v in count_sets(*full, new, counter).items(): counts[X] += v
+    keep = F | border(F)
+    return {"n": n, "min_support": ms, "counts": {X: v for X, v in counts.items() if len(X) == 1 or X in keep}}
+
+def build(transactions, min_support, weighted=False, counter="trie"):
+    # a full run is an update of the empty state; the border loop then is plain apriori
+    return update(new_state(min_support), transactions, None, weighted, counter)
+
+def frequent(state, min_conf=0.7):
+    # same shape as apriori(): per-level {frozenset: support} dicts and (X, Y, sup, conf) rules
+    n = state["n"]; allf = {X: state["counts"][X]/n for X in frequent_sets(state)}
+    levels = defaultdict(dict)
+    for X, v in allf.items(): levels[len(X)][X] = v
+    freq = [levels[k] for k in sorted(levels)] or [{}]
+    return freq, list(iter_rules(allf, min_conf))
+
+def save(state, path):
+    with open(path, "w") as f:
+        json.dump({"n": state["n"], "min_support": state["min_support"],
+                   "counts": [[sorted(X), v] for X, v in state["counts"].items()]}, f)
+
+def load(path):
+    with open(path) as f: d = json.load(f)
+    return {"n": d["n"], "min_support": d["min_support"], "counts": {frozenset(X): v for X, v in d["counts"]}}
+
+if __name__ == "__main__":
+    # args: state.json delta.json [old.json] [minsup] -- a missing state is built from delta
+    state_path, delta_path = sys.argv[1], sys.argv[2]
+    old_path = sys.argv[3] if len(sys.argv) > 3 and sys.argv[3] != "-" else None
+    minsup = float(sys.argv[4]) if len(sys.argv) > 4 else 0.5
+    delta = read(delta_path)
+    if os.path.exists(state_path): state = update(load(state_path), delta, read(old_path) if old_path else None)
+    else: state = build(delta, minsup)
+    save(state, state_path)
+    freq, rules = frequent(state)
+    print("Frequent:", freq)
+    print("Rules:", rules)
@@ -1,42 +1,101 @@
-import json, sys, math
-from collections import Counter
+import sys, math
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from txdb import TxDB, read
+from topk import TopK, best
 
 def minsup_count(minsup,n): return int(math.ceil(minsup*n)) if 0<minsup<=1 else int(minsup)
 
-def prepare(txns,m):
-    cnt=Counter(i for t in txns for i in set(t))
-    f_items=[i for i,c in cnt.items() if c>=m]
-    f_list=sorted(f_items,key=lambda x:(-cnt[x],x))
-    pos={i:k for k,i in enumerate(f_list)}
-    prepped=[]
-    for t in txns:
-        items=[i for i in t if i in pos]
-        if items:
-            items.sort(key=lambda i:pos[i])
-            prepped.append(items)
-    return prepped,f_list
-
-def hmine(txns,f_list,m,prefix,res,n):
-    if not f_list or not txns: return
+def prepare(rows,w,m):
+    # H-struct rows: each distinct basket stored once as sorted frequency ranks with its count;
+    # f_list maps rank -> item. Baskets that only differ in infrequent items merge here too.
     cnt=Counter()
-    for t in txns: cnt.update(set(t))
-    for a in reversed(f_list):
-        supp=cnt.get(a,0)
-        if supp<m: continue
-        newp=prefix+[a]; res.append((newp,supp/n))
-        proj=[t[t.index(a)+1:] for t in txns if a in t and t.index(a)+1<len(t)]
-        if not proj: continue
-        local_cnt=Counter(i for u in proj for i in set(u))
-        local_f=[i for i in f_list if i!=a and local_cnt.get(i,0)>=m]
-        if local_f: hmine(proj,local_f,m,newp,res,n)
-
-def hmine_mine(transactions, minsup):
-    n=len(transactions); m=minsup_count(minsup,n)
-    prepped,f_list=prepare(transactions,m); res=[]
-    hmine(prepped,f_list,m,[],res,n)
+    for t,k in zip(rows,w):
+        for i in set(t): cnt[i]+=k
+    f_list=sorted((i for i,c in cnt.items() if c>=m),key=lambda x:(-cnt[x],x))
+    pos={i:k for k,i in enumerate(f_list)}
+    prepped=Counter()
+    for t,k in zip(rows,w):
+        items=tuple(sorted({pos[i] for i in t if i in pos}))
+        if items: prepped[items]+=k
+    return list(prepped),list(prepped.values()),f_list
+
+def prepare_db(db,m):
+    # ids already are frequency ranks: the frequent items are exactly ids < k
+    k=int((db.counts()>=m).sum()); prepped=Counter()
+    for r,x in db.pairs():
+        r=tuple(r[:bisect_left(r,k)])
+        if r: prepped[r]+=x
+    return list(prepped),list(prepped.values()),db.items[:k]
+
+def thread(txns,links,off,ok,q):
+    # H-struct header: hang each link on the queue of its next item in ok, from pos+off on
+    for tid,p in links:
+        t=txns[tid]; p+=off
+        while p<len(t) and t[p] not in ok: p+=1
+        if p<len(t): q[t[p]].append((tid,p))
+
+def local_support(txns,w,links,off):
+    sup=defaultdict(int)
+    for tid,p in links:
+        t=txns[tid]; k=w[tid]
+        for j in range(p+off,len(t)): sup[t[j]]+=k
+    return sup
+
+def hmine(txns,w,links,f_list,m,prefix,res,n,off=0):
+    # links: (tid, pos) hyperlinks, the projection is txns[tid][pos+off:] without copying it.
+    # Every transaction sits on exactly one header queue, that of its next locally frequent
+    # item. Items are mined in rank order (the order inside each row); after mining a, its
+    # links move on to their next item, so each later queue holds all of its transactions by
+    # the time it is reached. One link per transaction per level, as in H-Mine.
+    sup=local_support(txns,w,links,off)
+    ok={i for i,c in sup.items() if c>=m}; q=defaultdict(list); thread(txns,links,off,ok,q)
+    for a in sorted(ok):
+        qa=q.pop(a)
+        newp=prefix+[f_list[a]]; res.append((newp,sup[a]/n))
+        hmine(txns,w,qa,f_list,m,newp,res,n,1)
+        thread(txns,qa,1,ok,q)
+
+def hmine_topk(txns,w,links,f_list,tk,max_len,prefix,res,off=0):
+    # hmine with the rising top-k border as threshold; most frequent items first so it rises
+    # early. Items that fell under the border are still re-threaded, later queues need them.
+    sup=local_support(txns,w,links,off)
+    ok={i for i,c in sup.items() if c>=tk.border()}; q=defaultdict(list); thread(txns,links,off,ok,q)
+    for a in sorted(ok):
+        qa=q.pop(a)
+        if sup[a]>=tk.border():
+            newp=prefix+[f_list[a]]; tk.push(sup[a]); res.append((newp,sup[a]))
+            if not max_len or len(newp)<max_len: hmine_topk(txns,w,qa,f_list,tk,max_len,newp,res,1)
+        thread(txns,qa,1,ok,q)
+
+def hmine_mine(transactions, minsup, weighted=False, topk=None, max_len=None):
+    # weighted: transactions are (items, count) pairs; identical baskets are merged either way
+    # topk: the topk most frequent itemsets of at most max_len items, minsup is ignored
+    db=isinstance(transactions,TxDB)
+    # plain rows go straight to prepare(), which merges identical baskets on their rank tuples
+    # without building a frozenset per row first
+    if db: n=transactions.total()
+    elif weighted: rows=[t for t,_ in transactions]; w=[k for _,k in transactions]; n=sum(w)
+    else: rows=transactions; w=[1]*len(rows); n=len(rows)
+    m=minsup_count(minsup,n)
+    if topk:
+        if db: cnt=transactions.counts().tolist()
+        else:
+            cnt=Counter()
+            for t,k in zip(rows,w):
+                for i in set(t): cnt[i]+=k
+            cnt=cnt.values()
+        tk=TopK(topk); tk.seed(cnt); m=tk.border()
+    if db: prepped,w,f_list=prepare_db(transactions,m)
+    else: prepped,w,f_list=prepare(rows,w,m)
+    res=[]; links=[(tid,0) for tid in range(len(prepped))]
+    if topk:
+        hmine_topk(prepped,w,links,f_list,tk,max_len,[],res)
+        return best(res,tk,n)
+    hmine(prepped,w,links,f_list,m,[],res,n)
     return res
 
 if __name__=="__main__":
     path=sys.argv[1]; minsup=float(sys.argv[2]) if len(sys.argv)>2 else 0.5
-    with open(path) as f: tx=json.load(f)
+    tx=read(path)
     print("Frequent:", hmine_mine(tx, minsup))
@@ -0,0 +1,45 @@
+import sys
+from collections import Counter, defaultdict
+from hmine import minsup_count
+from txdb import read
+
+# PrefixSpan over ordered sessions. Like hmine, sequences are stored once as frequency ranks
+# and a projection is a list of (sid, pos) pointers: the suffix seqs[sid][pos:] is never copied.
+# Support counts sessions containing the pattern as a (gapped) subsequence.
+
+def prepare(seqs,m):
+    # identical sessions collapse into one row with a count; infrequent items are dropped,
+    # which cannot break containment of any frequent pattern
+    cnt=Counter()
+    for s in seqs: cnt.update(set(s))
+    f_list=sorted((i for i,c in cnt.items() if c>=m),key=lambda x:(-cnt[x],x))
+    pos={i:k for k,i in enumerate(f_list)}
+    rows=Counter(tuple(pos[i] for i in s if i in pos) for s in seqs)
+    rows.pop((),None)
+    return list(rows),list(rows.values()),f_list
+
+def grow(rows,w,proj,f_list,m,max_len,prefix,res,n):
+    # first occurrence of each item after every pointer -> the projection of prefix+[item]
+    nxt=defaultdict(list); sup=defaultdict(int)
+    for sid,p in proj:
+        t=rows[sid]; seen=set()
+        for j in range(p,len(t)):
+            i=t[j]
+            if i in seen: continue
+            seen.add(i); nxt[i].append((sid,j+1)); sup[i]+=w[sid]
+    for i in sorted(nxt):
+        q=nxt.pop(i)
+        if sup[i]<m: continue
+        newp=prefix+[f_list[i]]; res.append((newp,sup[i]/n))
+        if not max_len or len(newp)<max_len: grow(rows,w,q,f_list,m,max_len,newp,res,n)
+
+def prefixspan(seqs, minsup, max_len=None):
+    n=len(seqs); m=minsup_count(minsup,n)
+    rows,w,f_list=prepare(seqs,m); res=[]
+    grow(rows,w,[(sid,0) for sid in range(len(rows))],f_list,m,max_len,[],res,n)
+    return res
+
+if __name__=="__main__":
+    path=sys.argv[1]; minsup=float(sys.argv[2]) if len(sys.argv)>2 else 0.5
+    max_len=int(sys.argv[3]) if len(sys.argv)>3 else None
+    print("Sequential:", prefixspan(read(path), minsup, max_len))
@@ -1,48 +1,105 @@
-import json, sys, math
+import json, os, sys, math
+from concurrent.futures import ProcessPoolExecutor
+
+# classes are kept exactly up to 2*MAX_BINS; past that neighbouring classes are merged
+# pairwise into wider ones, back down to about MAX_BINS (a mergeable histogram sketch)
+MAX_BINS = 1024
 
 def midpoints(interval):
     a,b=map(int,interval.split("-"))
     return (a+b)/2
 
-def stats(data):
-    n=sum(d["freq"] for d in data)
-    mids=[midpoints(d["class"]) for d in data]
-    freqs=[d["freq"] for d in data]
+class GroupedStats:
+    # one-pass grouped-frequency aggregator: weighted Welford mean/variance over class
+    # midpoints plus a (lo, hi) -> freq histogram for the grouped median and percentiles
+    def __init__(s, max_bins=MAX_BINS): s.n, s.mean, s.m2, s.bins, s.max_bins = 0, 0.0, 0.0, {}, max_bins
+
+    def add(s, lo, hi, f):
+        if not f: return
+        x=(lo+hi)/2; n=s.n+f; d=x-s.mean
+        s.mean+=d*f/n; s.m2+=d*(x-s.mean)*f; s.n=n
+        s.bins[(lo,hi)]=s.bins.get((lo,hi),0)+f
+        if len(s.bins)>2*s.max_bins: s.compress()
 
-    # mean
-    mean=sum(f*m for f,m in zip(freqs,mids))/n
+    def add_class(s, interval, f):
+        a,b=interval.split("-"); s.add(int(a),int(b),f)
 
-    # variance, std dev
-    var=sum(f*(m**2) for f,m in zip(freqs,mids))/n - mean**2
-    std=math.sqrt(var)
+    def merge(s, o):
+        # Chan et al. pairwise update, so partial results from workers combine exactly
+        if not o.n: return s
+        n=s.n+o.n; d=o.mean-s.mean
+        s.mean+=d*o.n/n; s.m2+=o.m2+d*d*s.n*o.n/n; s.n=n
+        for k,f in o.bins.items(): s.bins[k]=s.bins.get(k,0)+f
+        if len(s.bins)>2*s.max_bins: s.compress()
+        return s
 
-    # cumulative freq
-    cum=[sum(freqs[:i+1]) for i in range(len(freqs))]
+    def compress(s):
+        b=sorted(s.bins.items()); s.bins={}
+        for j in range(0,len(b),2):
+            (lo,hi),f=b[j]
+            if j+1<len(b): (_,hi),f2=b[j+1]; f+=f2
+            s.bins[(lo,hi)]=f
 
-    # median class
-    half=n/2
-    for i,c in enumerate(cum):
-        if c>=half:
-            L=int(data[i]["class"].split("-")[0])
-            h=int(data[i]["class"].split("-")[1]) - L
-            CF=c-freqs[i]
-            f=freqs[i]
-            median=L+((half-CF)/f)*h
-            break
+    def percentile(s, q):
+        # grouped interpolation L + ((q*n - CF) / f) * h inside the class holding the q-th share
+        target=q*s.n; cf=0
+        for (L,H),f in sorted(s.bins.items()):
+            if cf+f>=target: return L+((target-cf)/f)*(H-L)
+            cf+=f
+        return None
+
+    def result(s):
+        mean=s.mean; var=s.m2/s.n; std=math.sqrt(var)
+        median=s.percentile(0.5)
+        # mode (empirical relation)
+        mode=3*median-2*mean
+        # skewness
+        skew=(mean-median)/std if std else 0
+        return {"n":s.n,"mean":mean,"median":median,"mode":mode,
+                "variance":var,"std_dev":std,"skewness":skew}
+
+def stats(data):
+    g=GroupedStats()
+    for d in data: g.add_class(d["class"],d["freq"])
+    return g.result()
 
-    # mode (empirical relation)
-    mode=3*median-2*mean
+def iter_records(path, chunk=1<<20):
+    # {"class","freq"} records from a JSON array or JSONL file without loading it whole
+    dec=json.JSONDecoder(); buf=""; pos=0
+    with open(path) as f:
+        while True:
+            data=f.read(chunk); buf=buf[pos:]+data; pos=0
+            while True:
+                while pos<len(buf) and buf[pos] in " \t\r\n,[]": pos+=1
+                if pos>=len(buf): break
+                try: obj,end=dec.raw_decode(buf,pos)
+                except json.JSONDecodeError:
+                    if not data: raise
+                    break
+                yield obj; pos=end
+            if not data: return
 
-    # skewness
-    skew=(mean-median)/std if std else 0
+def stats_file(path):
+    g=GroupedStats()
+    for d in iter_records(path): g.add_class(d["class"],d["freq"])
+    return g
 
-    return {"n":n,"mean":mean,"median":median,"mode":mode,
-            "variance":var,"std_dev":std,"skewness":skew}
+def stats_files(paths, workers=None):
+    # one aggregator per file, in parallel when asked (at most one process per file and CPU),
+    # merged into one
+    workers=min(workers or 1,len(paths),os.cpu_count() or 1)
+    if workers>1:
+        with ProcessPoolExecutor(workers) as ex: parts=list(ex.map(stats_file,paths))
+    else: parts=[stats_file(p) for p in paths]
+    g=GroupedStats()
+    for p in parts: g.merge(p)
+    return g
 
 if __name__=="__main__":
     if len(sys.argv)<2:
-        print("Usage: python descriptive_stats.py db/age_freq.json"); sys.exit(1)
-    data=json.load(open(sys.argv[1]))
-    result=stats(data)
+        print("Usage: python descriptive_stats.py db/age_freq.json [more.json ...] [--workers=N]"); sys.exit(1)
+    opts=[a for a in sys.argv[1:] if a.startswith("--workers=")]; paths=[a for a in sys.argv[1:] if a not in opts]
+    workers=int(opts[-1].split("=",1)[1]) if opts else os.cpu_count()
+    result=stats_files(paths,workers).result()
     for k,v in result.items():
         print(f"{k}: {v:.2f}")
@@ -1,4 +1,43 @@
 import json, sys
+import numpy as np
+
+def batch_measures(n, A, B, AB):
+    # counts of A, B and A&B per rule (array-likes) -> {measure: float64 column}
+    n = float(n)
+    pA, pB, pAB = (np.asarray(x, dtype=np.float64) / n for x in (A, B, AB))
+    pNotB = 1 - pB
+    pA_notB = pA - pAB
+    with np.errstate(divide="ignore", invalid="ignore"):
+        confidence = np.where(pA > 0, pAB / pA, 0.0)
+        lift = np.where((pA > 0) & (pB > 0), pAB / (pA * pB), 0.0)
+        leverage = pAB - pA * pB
+        conviction = np.where(pA_notB > 0, pA * pNotB / pA_notB, np.inf)
+        odds_B_given_A = np.where(pA_notB > 0, pAB / pA_notB, np.inf)
+        rest = 1 - pA - pB + pAB
+        odds_B_given_notA = np.where(rest > 0, (pB - pAB) / rest, np.inf)
+        odds_ratio = np.where(odds_B_given_notA > 0, odds_B_given_A / odds_B_given_notA, np.inf)
+    return {"support": pAB, "confidence": confidence, "lift": lift, "leverage": leverage,
+            "conviction": conviction, "odds_ratio": odds_ratio}
+
+def rule_table(rules, supports):
+    # rules: (X, Y, ...) tuples as returned by the miners; supports: {frozenset: support fraction}
+    # covering every X, Y and X|Y -> columnar table with antecedent/consequent object columns
+    m = len(rules); ante = np.empty(m, dtype=object); cons = np.empty(m, dtype=object)
+    A = np.empty(m); B = np.empty(m); AB = np.empty(m)
+    for k, r in enumerate(rules):
+        X, Y = frozenset(r[0]), frozenset(r[1]); ante[k], cons[k] = X, Y
+        A[k], B[k], AB[k] = supports[X], supports[Y], supports[X | Y]
+    table = batch_measures(1, A, B, AB)
+    table["antecedent"], table["consequent"] = ante, cons
+    return table
+
+def select(table, idx):
+    # idx: boolean mask or index array, applied to every column
+    return {k: v[idx] for k, v in table.items()}
+
+def top(table, key, k=None, desc=True):
+    col = table[key]; idx = np.argsort(-col if desc else col, kind="stable")
+    return select(table, idx[:k])
 
 def rule_measures(data):
     n = data["transactions"]
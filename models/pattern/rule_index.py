@@ -0,0 +1,104 @@
+import json, sys
+import numpy as np
+from apriori import apriori
+from txdb import TxDB, read
+
+# Rules sorted by antecedent, so the rules sharing an antecedent are one id range [lo, hi).
+# The itemset trie over the sorted antecedent ids maps each antecedent to its range. A basket
+# query walks only the trie nodes whose path is a subset of the basket, so a rule that cannot
+# fire is never touched. On disk the index is a handful of CSR arrays in one .npz file, and
+# the trie is rebuilt from them on load.
+
+KEYS = ("support", "confidence", "lift")
+
+class RuleIndex:
+    __slots__ = ("items", "ids", "ante", "cons", "scores", "kids", "span")
+    def __init__(s, items, a_ptr, a_idx, c_ptr, c_idx, scores):
+        # a_*/c_*: antecedent/consequent CSR over item ids, rows already sorted by antecedent
+        s.items = items; s.ids = {i: k for k, i in enumerate(items)}
+        a_ptr, a_idx, c_ptr, c_idx = (np.asarray(x).tolist() for x in (a_ptr, a_idx, c_ptr, c_idx))
+        s.ante = [tuple(a_idx[a_ptr[r]:a_ptr[r+1]]) for r in range(len(a_ptr) - 1)]
+        s.cons = [tuple(c_idx[c_ptr[r]:c_ptr[r+1]]) for r in range(len(c_ptr) - 1)]
+        s.scores = {k: np.asarray(v, dtype=np.float64) for k, v in scores.items()}
+        s.kids, s.span = [{}], [[0, 0]]
+        for r, X in enumerate(s.ante):
+            node = 0
+            for i in X:
+                nxt = s.kids[node].get(i)
+                if nxt is None:
+                    nxt = s.kids[node][i] = len(s.kids); s.kids.append({}); s.span.append([r, r])
+                node = nxt
+            if s.span[node][1] == s.span[node][0]: s.span[node][0] = r
+            s.span[node][1] = r + 1
+
+    def __len__(s): return len(s.ante)
+
+    def encode(s, basket): return sorted(s.ids[i] for i in set(basket) if i in s.ids)
+
+    def fire(s, basket):
+        # ids of every rule whose antecedent is contained in the basket
+        b = s.encode(basket); out = []; stack = [(0, 0)]
+        while stack:
+            node, j = stack.pop(); lo, hi = s.span[node]
+            if hi > lo: out.extend(range(lo, hi))
+            kids = s.kids[node]
+            for k in range(j, len(b)):
+                c = kids.get(b[k])
+                if c is not None: stack.append((c, k + 1))
+        return out
+
+    def rules(s, rids):
+        # -> (X, Y, sup, conf) tuples, the same shape apriori returns
+        sup, conf = s.scores["support"], s.scores["confidence"]
+        return [(set(s.items[i] for i in s.ante[r]), set(s.items[i] for i in s.cons[r]), float(sup[r]), float(conf[r]))
+                for r in rids]
+
+    def recommend(s, basket, n=5, key="confidence"):
+        # top-n items not in the basket, each scored by its best firing rule
+        col = s.scores[key]; have = set(s.encode(basket)); best = {}
+        for r in s.fire(basket):
+            v = col[r]
+            for i in s.cons[r]:
+                if i not in have and v > best.get(i, -np.inf): best[i] = v
+        top = sorted(best.items(), key=lambda t: (-t[1], t[0]))[:n]
+        return [(s.items[i], float(v)) for i, v in top]
+
+def build(rules, supports=None):
+    # rules: (X, Y, sup, conf) tuples; supports: {frozenset: support} covering each Y, for lift
+    items = sorted({i for X, Y, *_ in rules for i in X | Y}, key=str); ids = {i: k for k, i in enumerate(items)}
+    enc = sorted((tuple(sorted(ids[i] for i in X)), tuple(sorted(ids[i] for i in Y)), sup, conf) for X, Y, sup, conf in rules)
+    a_ptr = np.cumsum([0] + [len(r[0]) for r in enc]); c_ptr = np.cumsum([0] + [len(r[1]) for r in enc])
+    a_idx = [i for r in enc for i in r[0]]; c_idx = [i for r in enc for i in r[1]]
+    sup = np.array([r[2] for r in enc], dtype=np.float64); conf = np.array([r[3] for r in enc], dtype=np.float64)
+    if supports is None: lift = np.full(len(enc), np.nan)
+    else: lift = conf / np.array([supports[frozenset(items[i] for i in r[1])] for r in enc], dtype=np.float64)
+    return RuleIndex(items, a_ptr, a_idx, c_ptr, c_idx, {"support": sup, "confidence": conf, "lift": lift})
+
+def save(idx, path):
+    a_ptr = np.cumsum([0] + [len(X) for X in idx.ante]); c_ptr = np.cumsum([0] + [len(Y) for Y in idx.cons])
+    small = np.int32 if len(idx.items) < 2**31 else np.int64
+    np.savez_compressed(path, items=np.frombuffer(json.dumps(idx.items).encode(), dtype=np.uint8),
+                        a_ptr=a_ptr, a_idx=np.array([i for X in idx.ante for i in X], dtype=small),
+                        c_ptr=c_ptr, c_idx=np.array([i for Y in idx.cons for i in Y], dtype=small),
+                        **{k: idx.scores[k] for k in KEYS})
+
+def load(path):
+    with np.load(path) as z:
+        return RuleIndex(json.loads(z["items"].tobytes()), z["a_ptr"], z["a_idx"], z["c_ptr"], z["c_idx"],
+                         {k: z[k] for k in KEYS})
+
+if __name__ == "__main__":
+    # args: index.npz --build tx.json [minsup] [minconf] -- mine and save
+    #       index.npz item [item ...]                   -- rules firing for a basket, top consequents
+    path = sys.argv[1]
+    if len(sys.argv) > 3 and sys.argv[2] == "--build":
+        tx = read(sys.argv[3])
+        minsup = float(sys.argv[4]) if len(sys.argv) > 4 else 0.5
+        minconf = float(sys.argv[5]) if len(sys.argv) > 5 else 0.7
+        freq, rules = apriori(tx if isinstance(tx, TxDB) else [set(t) for t in tx], minsup, minconf)
+        idx = build(rules, {X: v for level in freq for X, v in level.items()}); save(idx, path)
+        print(f"Indexed {len(idx)} rules -> {path}")
+    else:
+        idx = load(path)
+        print("Fired:", idx.rules(idx.fire(sys.argv[2:])))
+        print("Recommend:", idx.recommend(sys.argv[2:]))
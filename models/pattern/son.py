@@ -0,0 +1,84 @@
+import json, os, sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from apriori import count_sets
+from eclat import eclat
+from fp_growth import fpgrowth
+from hmine import hmine_mine
+from txdb import load, collapse
+
+# SON partitioned mining for data larger than memory. Pass 1 mines every chunk at the same
+# relative minsup: a globally frequent itemset is locally frequent in at least one chunk, so
+# the union of local results holds every answer. Pass 2 streams the data again and counts
+# that union exactly. Only one chunk per worker (plus a small queue) is in memory at a time.
+
+CHUNK = 100000
+MINERS = {"fp": fpgrowth, "ec": eclat, "hm": hmine_mine}
+_cfg = None
+
+def jsonl_chunks(path, size):
+    buf = []
+    with open(path) as f:
+        for l in f:
+            if l.strip(): buf.append(json.loads(l))
+            if len(buf) >= size: yield buf; buf = []
+    if buf: yield buf
+
+def source(path, size):
+    # -> (jobs, items): JSONL chunks are read here, a CSR store is split into (path, lo, hi)
+    # row ranges that each worker memory-maps itself; items decodes store ids
+    if os.path.isdir(path):
+        db = load(path)
+        return ((path, lo, min(lo + size, len(db))) for lo in range(0, len(db), size)), db.items
+    return jsonl_chunks(path, size), None
+
+def chunk_pairs(job):
+    if isinstance(job, tuple):
+        path, lo, hi = job; db = load(path)
+        w = [1] * (hi - lo) if db.weights is None else db.weights[lo:hi].tolist()
+        return list(db.rows(lo, hi)), w
+    return collapse(job)
+
+def _init(cfg):
+    global _cfg; _cfg = cfg
+
+def _local(job):
+    minsup, miner, _ = _cfg; rows, w = chunk_pairs(job)
+    return {frozenset(P) for P, _ in MINERS[miner](list(zip(rows, w)), minsup, weighted=True)}
+
+def _count(job):
+    rows, w = chunk_pairs(job)
+    return count_sets(rows, w, _cfg[2]), sum(w)
+
+def run(fn, jobs, workers, cfg):
+    # results in completion order; at most 2 * workers chunks are queued at once
+    if not workers or workers <= 1:
+        _init(cfg); yield from map(fn, jobs); return
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(cfg,)) as ex:
+        pending = set()
+        for job in jobs:
+            pending.add(ex.submit(fn, job))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done: yield f.result()
+        for f in as_completed(pending): yield f.result()
+
+def son(path, minsup, chunk=CHUNK, workers=None, miner="fp"):
+    # path: .jsonl file (one transaction per line) or a txdb store directory
+    if miner not in MINERS: raise ValueError("unknown miner: " + str(miner))
+    jobs, items = source(path, chunk); cands = set()
+    for local in run(_local, jobs, workers, (minsup, miner, None)): cands |= local
+    jobs, _ = source(path, chunk); n = 0; counts = defaultdict(int)
+    for part, k in run(_count, jobs, workers, (minsup, miner, list(cands))):
+        n += k
+        for X, v in part.items(): counts[X] += v
+    dec = (lambda X: sorted(items[i] for i in X)) if items else sorted
+    return [(dec(X), v / n) for X, v in counts.items() if v / n >= minsup]
+
+if __name__ == "__main__":
+    # args: path minsup [chunk] [workers] [miner]
+    path = sys.argv[1]; minsup = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    chunk = int(sys.argv[3]) if len(sys.argv) > 3 else CHUNK
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    miner = sys.argv[5] if len(sys.argv) > 5 else "fp"
+    print("Frequent:", son(path, minsup, chunk, workers, miner))
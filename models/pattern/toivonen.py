@@ -0,0 +1,81 @@
+import math, sys
+import numpy as np
+from collections import Counter
+from apriori import count_sets
+from eclat import eclat
+from fp_growth import fpgrowth
+from hmine import hmine_mine
+from fup import border
+from txdb import TxDB, read, collapse
+
+# Toivonen sampling: mine a random sample at a threshold lowered by the Hoeffding margin
+# eps = sqrt(ln(1/delta) / 2s), so with probability >= 1-delta nothing frequent is missed.
+# The sample is grown when needed so that eps <= minsup/2: a smaller sample would push the
+# lowered threshold toward a single occurrence and enumerate every subset of every sampled
+# basket. When that sample would be the whole database it is mined exactly instead.
+# Only the sampled rows are read: row indices are drawn from the cumulative weights first.
+# Without verification supports are sample estimates with +-eps intervals. Verification is one
+# full pass over the sample's frequent sets and their negative border: if no border set turns
+# out frequent the answer is exact, otherwise the frequent border sets found are added and
+# exact=False says a second pass could still find more.
+
+MINERS = {"fp": fpgrowth, "ec": eclat, "hm": hmine_mine}
+
+def sample_size(minsup, delta): return math.ceil(math.log(1 / delta) / (2 * (minsup / 2) ** 2))
+
+def draw(transactions, s, seed, weighted=False):
+    # -> (s sampled rows, total weight n); TxDB rows stay ids, nothing else is decoded
+    rng = np.random.default_rng(seed)
+    if isinstance(transactions, TxDB):
+        db = transactions; n = db.total()
+        idx = rng.integers(len(db), size=s) if db.weights is None else \
+            np.searchsorted(np.cumsum(db.weights), rng.random(s) * n, side="right")
+        return [db.row(int(i)).tolist() for i in idx], n
+    if not weighted:
+        n = len(transactions)
+        return [transactions[int(i)] for i in rng.integers(n, size=s)], n
+    cw = np.cumsum([k for _, k in transactions]); n = int(cw[-1]) if len(cw) else 0
+    return [transactions[int(i)][0] for i in np.searchsorted(cw, rng.random(s) * n, side="right")], n
+
+def total(transactions, weighted=False):
+    if isinstance(transactions, TxDB): return transactions.total()
+    return sum(k for _, k in transactions) if weighted else len(transactions)
+
+def toivonen(transactions, minsup, sample=0.1, delta=0.05, verify=True, seed=None, miner="fp", weighted=False):
+    # sample: row count, or a fraction of the total when <= 1
+    # -> ([(items, support, (lo, hi))], exact)
+    if miner not in MINERS: raise ValueError("unknown miner: " + str(miner))
+    if not 0 < minsup <= 1: raise ValueError("minsup must be a fraction in (0, 1]")
+    db = transactions if isinstance(transactions, TxDB) else None
+    dec = (lambda X: sorted(db.decode(X))) if db else sorted
+    n = total(transactions, weighted)
+    s = max(1, int(sample * n) if sample <= 1 else int(sample), sample_size(minsup, delta))
+    if s >= n:
+        # a sample this large is no cheaper than the data: mine it exactly
+        res = MINERS[miner](transactions, minsup, weighted=weighted)
+        return sorted(((sorted(X), p, (p, p)) for X, p in res), key=lambda r: -r[1]), True
+    picked, _ = draw(transactions, s, seed, weighted)
+    eps = math.sqrt(math.log(1 / delta) / (2 * s)); low = minsup - eps
+    est = {frozenset(P): p for P, p in MINERS[miner](picked, low)}
+    if not verify:
+        res = [(X, p, (max(0.0, p - eps), min(1.0, p + eps))) for X, p in est.items()]
+        exact = False
+    else:
+        rows, w = (list(db.rows()), db.counts_list()) if db else collapse(transactions, weighted)
+        F = set(est); nb = border(F)
+        counts = count_sets(rows, w, F | nb); items = Counter()
+        for t, k in zip(rows, w):
+            for i in t: items[frozenset([i])] += k
+        counts.update(items)
+        missed = [X for X in nb | (set(items) - F) if counts.get(X, 0) / n >= minsup]
+        res = [(X, counts[X] / n, (counts[X] / n,) * 2) for X in F | set(missed) if counts.get(X, 0) / n >= minsup]
+        exact = not missed
+    return sorted(((dec(X), p, ci) for X, p, ci in res), key=lambda r: -r[1]), exact
+
+if __name__ == "__main__":
+    # args: path minsup [sample] [verify 0/1]
+    path = sys.argv[1]; minsup = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    sample = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    verify = sys.argv[4] != "0" if len(sys.argv) > 4 else True
+    res, exact = toivonen(read(path), minsup, sample, verify=verify)
+    print("Exact:" if exact else "Approximate:", res)
@@ -0,0 +1,24 @@
+import heapq
+
+# support border for top-k mining: a min-heap of the k best supports seen so far. Once it is
+# full, nothing below its smallest entry can make the top k, so miners prune against border().
+# Itemsets tied with the k-th support are all kept, so a result may hold more than k sets.
+
+class TopK:
+    def __init__(s, k, m=1): s.k, s.m, s.h = k, m, []
+
+    def border(s): return max(s.m, s.h[0]) if len(s.h) >= s.k else s.m
+
+    def push(s, sup):
+        if len(s.h) < s.k: heapq.heappush(s.h, sup)
+        elif sup > s.h[0]: heapq.heapreplace(s.h, sup)
+
+    def seed(s, sups):
+        # the k best single items are k itemsets already, so the k-th best item support is a safe floor
+        top = heapq.nlargest(s.k, sups)
+        if len(top) == s.k: s.m = max(s.m, top[-1])
+
+def best(res, tk, n):
+    # res: [(items, support count)] -> the top-k part as (items, support), highest support first
+    b = tk.border()
+    return sorted(((P, s/n) for P, s in res if s >= b), key=lambda r: -r[1])
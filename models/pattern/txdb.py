@@ -0,0 +1,106 @@
+import json, sys, os
+from collections import Counter
+import numpy as np
+
+# CSR transaction store: row r is indices[indptr[r]:indptr[r+1]], sorted dense item ids.
+# ids are assigned in frequency order (0 = most frequent), items[id] is the original item.
+# rows are distinct baskets, weights[r] is how many times basket r occurred (None = all 1).
+
+CHUNK = 65536
+
+def collapse(txns, weighted=False):
+    # merge identical baskets: plain transactions or (items, count) pairs -> (rows, counts)
+    c = Counter()
+    for t in txns:
+        t, k = t if weighted else (t, 1)
+        c[frozenset(t)] += k
+    return list(c), list(c.values())
+
+def to_bits(tids, n):
+    b = bytearray((n + 7) // 8)
+    for t in tids: b[t >> 3] |= 1 << (t & 7)
+    return int.from_bytes(b, "little")
+
+def bit_planes(w):
+    # plane b marks the rows whose count has bit b set, so a weighted popcount is
+    # sum((X & plane_b).bit_count() << b)
+    return [(b, to_bits([r for r, k in enumerate(w) if k >> b & 1], len(w))) for b in range(max(w, default=0).bit_length())]
+
+def plane_count(planes, X): return sum((X & B).bit_count() << b for b, B in planes)
+
+class TxDB:
+    __slots__ = ("indptr", "indices", "items", "weights")
+    def __init__(s, indptr, indices, items, weights=None):
+        s.indptr, s.indices, s.items, s.weights = indptr, indices, items, weights
+
+    def __len__(s): return len(s.indptr) - 1
+
+    def total(s): return len(s) if s.weights is None else int(s.weights.sum())
+
+    def counts_list(s): return [1] * len(s) if s.weights is None else s.weights.tolist()
+
+    def pairs(s): return zip(s.rows(), s.counts_list())
+
+    def __iter__(s): return s.rows()
+
+    def row(s, r): return s.indices[s.indptr[r]:s.indptr[r+1]]
+
+    def rows(s, lo=0, hi=None):
+        # plain int lists, converted a block at a time
+        hi = len(s) if hi is None else hi
+        for a in range(lo, hi, CHUNK):
+            b = min(a + CHUNK, hi); ip = s.indptr[a:b+1]
+            block = s.indices[ip[0]:ip[-1]].tolist(); off = (ip - ip[0]).tolist()
+            for j in range(b - a): yield block[off[j]:off[j+1]]
+
+    def counts(s):
+        if s.weights is None: return np.bincount(s.indices, minlength=len(s.items))
+        w = np.repeat(s.weights, np.diff(s.indptr))
+        return np.bincount(s.indices, weights=w, minlength=len(s.items)).astype(np.int64)
+
+    def vertical(s):
+        # {frozenset([id]): set(tids)}, same shape as eclat.vertical_format
+        tids = np.repeat(np.arange(len(s), dtype=np.int64), np.diff(s.indptr))
+        order = np.argsort(s.indices, kind="stable")
+        cuts = np.cumsum(np.bincount(s.indices, minlength=len(s.items)))[:-1]
+        return {frozenset([i]): set(T.tolist()) for i, T in enumerate(np.split(tids[order], cuts)) if len(T)}
+
+    def decode(s, ids): return [s.items[i] for i in ids]
+
+def encode(txns, weighted=False):
+    rows, w = collapse(txns, weighted)
+    cnt = Counter()
+    for t, k in zip(rows, w):
+        for i in t: cnt[i] += k
+    items = sorted(cnt, key=lambda x: (-cnt[x], x)); ids = {i: k for k, i in enumerate(items)}
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64); indices = []
+    for r, t in enumerate(rows):
+        row = sorted(ids[i] for i in t); indices += row; indptr[r+1] = indptr[r] + len(row)
+    return TxDB(indptr, np.asarray(indices, dtype=np.int32), items, np.asarray(w, dtype=np.int64))
+
+def save(db, path):
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "indptr.npy"), db.indptr)
+    np.save(os.path.join(path, "indices.npy"), db.indices)
+    if db.weights is not None: np.save(os.path.join(path, "weights.npy"), db.weights)
+    with open(os.path.join(path, "items.json"), "w") as f: json.dump(db.items, f)
+
+def load(path, mmap=True):
+    mode = "r" if mmap else None
+    with open(os.path.join(path, "items.json")) as f: items = json.load(f)
+    wp = os.path.join(path, "weights.npy")
+    return TxDB(np.load(os.path.join(path, "indptr.npy"), mmap_mode=mode),
+                np.load(os.path.join(path, "indices.npy"), mmap_mode=mode), items,
+                np.load(wp, mmap_mode=mode) if os.path.exists(wp) else None)
+
+def read(path):
+    # store directory -> TxDB, .jsonl -> one transaction per line, anything else -> json list
+    if os.path.isdir(path): return load(path)
+    with open(path) as f:
+        if path.endswith(".jsonl"): return [json.loads(l) for l in f if l.strip()]
+        return json.load(f)
+
+if __name__ == "__main__":
+    src = sys.argv[1]; dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".txdb"
+    db = encode(read(src)); save(db, dst)
+    print(f"Wrote {db.total()} transactions ({len(db)} distinct), {len(db.items)} items -> {dst}")
@@ -0,0 +1,53 @@
+import json, sys, os
+import numpy as np
+
+# IBM Quest-style synthetic baskets (Agrawal & Srikant): a pool of potential patterns whose
+# items follow a Zipf law over the catalogue, each sharing part of its items with the previous
+# pattern; transactions are filled with weighted picks from the pool, each pick corrupted by
+# dropping some of its items. Pattern and basket sizes are capped at the catalogue size, and a
+# basket stops after TRIES picks that add nothing new.
+
+TRIES = 100
+
+def quest(n, avg_len=10, n_items=1000, n_patterns=200, avg_pat=4, zipf=1.0, corr=0.5, seed=None):
+    rng = np.random.default_rng(seed)
+    p_item = 1.0 / np.arange(1, n_items + 1) ** zipf; p_item /= p_item.sum()
+    pats, prev = [], np.empty(0, dtype=np.int64)
+    for _ in range(n_patterns):
+        size = min(max(1, rng.poisson(avg_pat)), n_items)
+        keep = min(len(prev), size, int(round(min(1.0, rng.exponential(corr)) * size)))
+        items = set(rng.choice(prev, keep, replace=False).tolist()) if keep else set()
+        while len(items) < size: items.update(rng.choice(n_items, size - len(items), p=p_item).tolist())
+        prev = np.fromiter(items, dtype=np.int64); pats.append(prev)
+    w = rng.exponential(1.0, n_patterns); w /= w.sum()
+    noise = np.clip(rng.normal(0.5, 0.1, n_patterns), 0.0, 1.0)
+    tx = []
+    for size in np.clip(rng.poisson(avg_len, n), 1, n_items):
+        t = set(); stale = 0
+        while len(t) < size and stale < TRIES:
+            k = rng.choice(n_patterns, p=w); P = pats[k]
+            while len(P) and rng.random() < noise[k]: P = np.delete(P, rng.integers(len(P)))
+            if t and len(t) + len(P) > size and rng.random() < 0.5: break
+            had = len(t); t.update(P.tolist()); stale = stale + 1 if len(t) == had else 0
+        tx.append(sorted(f"i{i}" for i in t))
+    return tx
+
+if __name__ == "__main__":
+    # args: n [avg_len] [n_items] [n_patterns] [zipf] [seed] [outfile]
+    a = sys.argv
+    n = int(a[1]) if len(a) > 1 else 1000
+    avg_len = float(a[2]) if len(a) > 2 else 10
+    n_items = int(a[3]) if len(a) > 3 else 1000
+    n_patterns = int(a[4]) if len(a) > 4 else 200
+    zipf = float(a[5]) if len(a) > 5 else 1.0
+    seed = int(a[6]) if len(a) > 6 else None
+    outfile = a[7] if len(a) > 7 else "db/raw/tx_quest.json"
+
+    tx = quest(n, avg_len, n_items, n_patterns, zipf=zipf, seed=seed)
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    with open(outfile, "w") as f:
+        if outfile.endswith(".jsonl"):
+            for t in tx: f.write(json.dumps(t) + "\n")
+        else: json.dump(tx, f)
+
+    print(f"Wrote {n} quest transactions (avg {sum(map(len, tx)) / max(n, 1):.1f} items) -> {outfile}")
@@ -1,40 +1,76 @@
 import json, sys, os
+from concurrent.futures import ProcessPoolExecutor
 from collections import Counter
 from itertools import combinations
 
-def summarize(transactions, max_k=2, lowercase=True, sort_items=True, drop_empty=True):
+# itemset keys in the output: items joined by SEP, so "ab"+"c" and "a"+"bc" stay apart
+SEP = ","
+
+def count_level(job):
+    # one chunk, one level: count k-combinations whose two (k-1)-subsets that share
+    # all but one item were frequent (anti-monotone pruning between levels)
+    rows, k, prev, alive = job
+    c = Counter()
+    for t in rows:
+        t = [i for i in t if i in alive]
+        if len(t) < k: continue
+        for comb in combinations(t, k):
+            if comb[:-1] in prev and comb[1:] in prev: c[comb] += 1
+    return c
+
+def summarize(transactions, max_k=2, lowercase=True, sort_items=True, drop_empty=True, min_count=1, workers=None):
+    # itemsets are counted as tuples of int ids, in sorted item order, or with sort_items=False
+    # in the order the items first appear in the transaction (so "b,a" and "a,b" stay apart);
+    # only itemsets seen at least min_count times are reported, and only those are extended
+    # to the next level
     # normalize transactions
     norm = []
     for t in transactions:
-        if drop_empty and not t: 
+        if drop_empty and not t:
             continue
         items = [i.strip() for i in t if isinstance(i, str)]
         if lowercase:
             items = [i.lower() for i in items]
-        if sort_items:
-            items.sort()
         if items:
-            norm.append(items)
+            norm.append(dict.fromkeys(items))
 
     n = len(norm)
-    counts = Counter()
+    names = sorted(set().union(*norm))
+    ids = {x: i for i, x in enumerate(names)}
+    rows = [tuple(sorted(ids[x] for x in t)) if sort_items else tuple(ids[x] for x in t) for t in norm]
 
-    for t in norm:
-        for k in range(1, max_k+1):
-            for comb in combinations(t, k):
-                counts["".join(comb)] += 1
+    level = Counter(i for t in rows for i in t)
+    level = {(i,): v for i, v in level.items() if v >= min_count}
+    counts = dict(level)
+    parts = max(1, workers or 1); size = (len(rows) + parts - 1) // parts or 1
+    chunks = [rows[a:a+size] for a in range(0, len(rows), size)]
+    ex = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+    try:
+        for k in range(2, max_k+1):
+            prev = set(level); alive = {i for c in prev for i in c}
+            jobs = [(ch, k, prev, alive) for ch in chunks]
+            level = Counter()
+            for c in (ex.map(count_level, jobs) if ex else map(count_level, jobs)): level.update(c)
+            level = {c: v for c, v in level.items() if v >= min_count}
+            if not level: break
+            counts.update(level)
+    finally:
+        if ex: ex.shutdown()
 
-    return {"transactions": n, "counts": dict(counts)}
+    return {"transactions": n, "counts": {SEP.join(names[i] for i in c): v for c, v in counts.items()}}
 
 if __name__ == "__main__":
+    # args: [infile] [min_count] [workers]
     infile  = sys.argv[1] if len(sys.argv) > 1 else "db/raw/tx.json"
+    min_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
     base    = os.path.splitext(os.path.basename(infile))[0]
     outfile = f"db/processed/{base}.json"
 
     with open(infile) as f:
         tx = json.load(f)
 
-    summary = summarize(tx)
+    summary = summarize(tx, min_count=min_count, workers=workers)
 
     os.makedirs(os.path.dirname(outfile), exist_ok=True)
     with open(outfile, "w") as f: